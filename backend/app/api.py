@@ -1,92 +1,62 @@
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Awaitable
 from datetime import datetime
 from contextlib import asynccontextmanager
-import anthropic
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.sse import sse_client
 from enum import Enum
+import asyncio
 import json
 import pprint
+import time
+import uuid
 from os import getenv
+from urllib.parse import urljoin
+import httpx
 
 import log_setup as log_setup
 import logging
+import llm
+import conversation
+import metrics
+from opentelemetry import trace
+from tracing import tracer, inject_context
+from conversation_store import conversation_store
+from mcp_pool import mcp_pool, MCPUnavailableError, MCP_TRANSPORT, MCP_SERVER_URL, load_inprocess_module
+from tool_catalog import tool_catalog
+from tool_cache import tool_cache, TOOL_CACHE_ENABLED
+from llm_scheduler import llm_scheduler, SchedulerBusyError
+from broadcast import ConnectionManager
 
 logger = log_setup.configure_logging()
 
-anthropic_client = anthropic.Anthropic()
+# Limits for running the tool calls of a single model response
+TOOL_PARALLELISM = int(getenv("TOOL_PARALLELISM", "4"))
+TOOL_TIMEOUT_SECONDS = float(getenv("TOOL_TIMEOUT_SECONDS", "30"))
+# The MCP server's task export route, on the same host as its MCP endpoint
+MCP_TASK_EXPORT_URL = getenv("MCP_TASK_EXPORT_URL", urljoin(MCP_SERVER_URL, "/tasks/export"))
 
 class ChatRequest(BaseModel):
     """Defines the chat request model."""
     message: str = Field(..., description="The user's message to the chatbot")
+    session_id: Optional[str] = Field(
+        None, description="Continue a conversation stored on the server"
+    )
     conversation_history: Optional[List[Dict[str, str]]] = Field(
-        None, description="Optional conversation history"
+        None, description="Optional conversation history, when not using session_id"
     )
 
 class ChatResponse(BaseModel):
     """Defines the chat response model."""
     response: str = Field(..., description="The chatbot's response message")
-    conversation_history: List[Dict[str, str]] = Field(
-        ..., description="Updated conversation history including the latest exchange"
+    session_id: str = Field(..., description="ID to send with the next message of this conversation")
+    conversation_history: Optional[List[Dict[str, Any]]] = Field(
+        None, description="Updated conversation history, only when the request had no session_id"
     )
 
-class ConnectionManager:
-    """Manages WebDocket connections for real-time chat communication"""
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-
-    async def connect(self, websocket: WebSocket):
-        """Accepts a new websocket connection"""
-        await websocket.accept()
-        self.active_connections.append(websocket)
-
-    def disconnect(delf, websocket: WebSocket):
-        """Removes a websocket connection from the active connections list"""
-        self.active_connections.remove(websocket)
-
-    async def broadcast(self, message: str):
-        """Sends a message to all active connections"""
-        for connection in self.active_connections:
-            await connection.send_text(message)
-
 manager = ConnectionManager()
-
-## define MCP tools for claude
-MCP_TOOLS = [
-    {
-        "name": "return_fourty_two",
-        "description": "Returns the number 42",
-        "input_schema": {
-            "type": "object",
-            "properties": {},
-            "required": []
-        }
-    },
-    {
-        "name": "create_task_tool",
-        "description": "Create a new task witha title, and optional description, status, and due date",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "task": {
-                    "type": "object",
-                    "properties": {
-                        "title": {"type": "string", "minLength": 1, "maxLength": 200},
-                        "description": {"type": "string"},
-                        "status": {"type": "string", "enum": ["To Do", "In Progress", "Done"]},
-                        "due_date": {"type": "string", "format": "date-time"}
-                    },
-                    "required": ["title"]
-                }
-            },
-            "required": ["task"]
-        }
-    }
-]
+metrics.WEBSOCKET_CONNECTIONS.labels(endpoint="/ws").set_function(lambda: len(manager.active_connections))
 
 class TaskStatus(str, Enum):
     """Defines task status enumeration."""
@@ -101,32 +71,33 @@ class Task(BaseModel):
     status: Optional[TaskStatus] = Field(TaskStatus.TODO, description="Task status")
     due_date: Optional[datetime] = Field(None, description="Task due date")
 
-# Global MCP session variable
-mcp_session = None
+class BulkTaskRequest(BaseModel):
+    """Defines the bulk task creation request model."""
+    tasks: List[Dict[str, Any]] = Field(..., description="Tasks to create, each with the fields of Task")
+    atomic: bool = Field(False, description="Create no task at all if any of them is invalid")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage MCP client lifecycle."""
-    global mcp_session
-    mcp_server_url = "http://mcp-server:8001/sse"
-    logger.info(f"Connecting to MCP server at {mcp_server_url}")
-    print(f"Connecting to MCP server at {mcp_server_url}")
     try:
-        async with sse_client(mcp_server_url) as (read, write):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-                mcp_session = session
-                logger.info("MCP clent session initialized")
-
-                yield # FastAPI runs while this context is active
-
-                logger.info("Shutting down MCP client session")
+        await mcp_pool.start()
     except Exception as e:
         logger.error(f"Failed to connect to MCP server: {e}")
-        yield # start anyways, but endpoints fail gracefully
-
-    logger.info("MCP client session closed")
-    mcp_session = None
+    if not mcp_pool.available:
+        logger.error("No MCP sessions connected yet, reconnecting in the background")
+    else:
+        try:
+            await tool_catalog.refresh()
+        except Exception as e:
+            logger.error(f"Failed to load MCP tool catalog: {e}")
+
+    yield # FastAPI runs while this context is active
+
+    logger.info("Shutting down MCP client sessions")
+    await mcp_pool.close()
+    await conversation_store.close()
+    await llm.close()
+    logger.info("Anthropic client closed")
 
 app = FastAPI(
     title="Task Manager API",
@@ -153,6 +124,52 @@ async def websocket_endpoint(websocket: WebSocket):
     except WebSocketDisconnect:
         manager.disconnect(websocket)
 
+async def request_completion(
+    websocket: WebSocket,
+    messages: List[Dict[str, Any]],
+    stream: bool,
+    usage: llm.TurnUsage,
+    client_id: str,
+    first_call: bool
+):
+    """
+    Get the next model response for a websocket chat turn.
+
+    The call waits for a slot from the LLM scheduler; only the first call
+    of a turn may be turned away as busy. When streaming, text deltas and
+    the start of each tool_use block are relayed to the client as they
+    arrive instead of after the whole message.
+    """
+    tools = await tool_catalog.anthropic_tools()
+    async with llm_scheduler.slot(client_id, can_reject=first_call):
+        if not stream:
+            return await llm.create_message(messages, tools, usage)
+        response = await stream_completion(websocket, messages, tools)
+    usage.add(response.usage)
+    return response
+
+async def stream_completion(websocket: WebSocket, messages: List[Dict[str, Any]], tools: List[Dict[str, Any]]):
+    """Stream one model response, relaying text deltas and tool-use starts."""
+    start = time.perf_counter()
+    with tracer.start_as_current_span("anthropic.messages.stream", attributes={"llm.model": llm.ANTHROPIC_MODEL}) as span:
+        async with llm.stream_message(messages, tools) as message_stream:
+            async for event in message_stream:
+                if event.type == "text":
+                    await websocket.send_json({
+                        "type": "text_delta",
+                        "text": event.text
+                    })
+                elif event.type == "content_block_start" and event.content_block.type == "tool_use":
+                    await websocket.send_json({
+                        "type": "tool_use_start",
+                        "tool_name": event.content_block.name,
+                        "tool_use_id": event.content_block.id
+                    })
+            response = await message_stream.get_final_message()
+        llm.set_usage_attributes(span, response)
+    metrics.LLM_CALL_SECONDS.labels(mode="stream").observe(time.perf_counter() - start)
+    return response
+
 @app.websocket("/ws/chat")
 async def websocket_chat(websocket: WebSocket):
     """
@@ -161,12 +178,28 @@ async def websocket_chat(websocket: WebSocket):
     JSON format for incommint messages:
     {
       "role": "user",
-      "message": "Create a task to buy groceries"
+      "message": "Create a task to buy groceries",
+      "stream": true # Optional, relay "text_delta" frames as the model writes
     }
+
+    Connect with `?protocol=2` to get only the messages added by each turn
+    in "response" frames, numbered by "seq", instead of the full history.
+    A client that misses a turn can resync by sending {"type": "snapshot"}.
     """
     await websocket.accept()
+    protocol = websocket.query_params.get("protocol", "1")
+    if protocol not in ("1", "2"):
+        logger.error(f"Unsupported websocket chat protocol {protocol!r}")
+        await websocket.send_json({
+            "type": "error",
+            "message": f"Unsupported protocol {protocol!r}, use 1 or 2."
+        })
+        # 1008: policy violation
+        await websocket.close(code=1008)
+        return
+    protocol = int(protocol)
     logger.debug("Websocket chat connection accepted")
-    if not mcp_session:
+    if not await mcp_pool.wait_available():
         logger.error("No MCP session available for websocket chat")
         await websocket.send_json({
             "type": "error",
@@ -176,91 +209,120 @@ async def websocket_chat(websocket: WebSocket):
         return
 
     conversation_history = []
+    # Fair-queuing key for this connection's LLM calls
+    client_id = f"ws-{uuid.uuid4().hex[:8]}"
+    # Number of completed turns, used as the sequence number of protocol 2 responses
+    seq = 0
+    connections = metrics.WEBSOCKET_CONNECTIONS.labels(endpoint="/ws/chat")
+    connections.inc()
 
     try:
         while True:
             data = await websocket.receive_json()
+            if data.get("type") == "snapshot":
+                await websocket.send_json({
+                    "type": "snapshot",
+                    "seq": seq,
+                    "conversation_history": conversation_history
+                })
+                continue
             logger.debug(f"Received message: {data.get('message')}")
             user_message = data.get("message")
             logger.info(f"Received chat message: {user_message}")
             if not user_message:
                 continue
-
-            conversation_history.append({
-                "role": "user",
-                "content": user_message
-            })
-
-            response = anthropic_client.messages.create(
-                model=getenv("ANTHROPIC_MODEL", "claude-sonnet-4-5-20250929"),
-                max_tokens=4096,
-                tools=MCP_TOOLS,
-                messages=conversation_history
-            )
-            logger.info(f"Received response from Claude: {response.content}")
-
-            while response.stop_reason == "tool_use":
-                tool_use_block = next(
-                    block for block in response.content if block.type == "tool_use"
-                )
-                # Send tool usage notification to the client
-                await websocket.send_json({
-                    "type": "tool_use",
-                    "tool_name": tool_use_block.name,
-                    "tool_input": tool_use_block.input
-                })
-                # Execute the MCP tool
-                tool_result = await execute_mcp_tool(
-                    tool_use_block.name,
-                    tool_use_block.input
-                )
-                # send tool result notification
-                await websocket.send_json({
-                    "type": "tool_result",
-                    "tool_name": tool_use_block.name,
-                    "result": tool_result
-                })
-                conversation_history.append({
-                    "role": "assistant",
-                    "content": [block.model_dump() for block in response.content]
-                })
+            stream = bool(data.get("stream", False))
+            usage = llm.TurnUsage()
+            with tracer.start_as_current_span(
+                "chat turn",
+                attributes={"chat.endpoint": "/ws/chat", "chat.client_id": client_id, "chat.stream": stream}
+            ) as span:
                 conversation_history.append({
                     "role": "user",
-                    "content": [
-                        {
-                            "type": "tool_result",
-                            "tool_use_id": tool_use_block.id,
-                            "content": tool_result
-                        }
-                    ]
+                    "content": user_message
                 })
-
-                response = anthropic_client.messages.create(
-                    model=getenv("ANTHROPIC_MODEL", "claude-sonnet-4-5-20250929"),
-                    max_tokens=4096,
-                    tools=MCP_TOOLS,
-                    messages=conversation_history
+                # Keep per-connection memory and per-call prompt size within the token budget
+                conversation_history = await conversation.compact(conversation_history, client_id, usage)
+                turn_start = len(conversation_history) - 1
+
+                try:
+                    response = await request_completion(
+                        websocket, conversation_history, stream, usage, client_id, first_call=True
+                    )
+                except SchedulerBusyError as e:
+                    # Drop the turn so the history doesn't keep an unanswered message
+                    conversation_history.pop()
+                    await websocket.send_json({
+                        "type": "busy",
+                        "message": str(e),
+                        "retry_after": e.retry_after
+                    })
+                    continue
+                logger.info(f"Received response from Claude: {response.content}")
+                iterations = 0
+
+                while response.stop_reason == "tool_use":
+                    iterations += 1
+                    tool_use_blocks = [
+                        block for block in response.content if block.type == "tool_use"
+                    ]
+                    # Send tool usage notifications to the client
+                    for tool_use_block in tool_use_blocks:
+                        await websocket.send_json({
+                            "type": "tool_use",
+                            "tool_name": tool_use_block.name,
+                            "tool_input": tool_use_block.input
+                        })
+
+                    async def send_tool_result(tool_use_block, tool_result):
+                        await websocket.send_json({
+                            "type": "tool_result",
+                            "tool_name": tool_use_block.name,
+                            "result": tool_result
+                        })
+
+                    # Execute all requested MCP tools, notifying the client as each finishes
+                    tool_results = await execute_tool_uses(tool_use_blocks, send_tool_result)
+                    conversation_history.append({
+                        "role": "assistant",
+                        "content": [block.model_dump() for block in response.content]
+                    })
+                    conversation_history.append({
+                        "role": "user",
+                        "content": tool_results
+                    })
+
+                    response = await request_completion(
+                        websocket, conversation_history, stream, usage, client_id, first_call=False
+                    )
+
+                usage.log()
+                metrics.observe_turn("/ws/chat", usage, iterations)
+                span.set_attribute("chat.tool_iterations", iterations)
+                final_response = next(
+                    (block for block in response.content if hasattr(block, "text")),
+                    "I've completed your request."
                 )
 
-            final_response = next(
-                (block for block in response.content if hasattr(block, "text")),
-                "I've completed your request."
-            )
-
-            if final_response:
-                conversation_history.append({
-                    "role": "assistant",
-                    "content": final_response.text
-                })
-                await websocket.send_json({
-                    "type": "response",
-                    "message": final_response.text,
-                    "conversation_history": conversation_history
-                })
-
-
-    
-
+                if final_response:
+                    conversation_history.append({
+                        "role": "assistant",
+                        "content": final_response.text
+                    })
+                    seq += 1
+                    if protocol >= 2:
+                        await websocket.send_json({
+                            "type": "response",
+                            "message": final_response.text,
+                            "seq": seq,
+                            "messages": conversation_history[turn_start:]
+                        })
+                    else:
+                        await websocket.send_json({
+                            "type": "response",
+                            "message": final_response.text,
+                            "conversation_history": conversation_history
+                        })
 
     except WebSocketDisconnect:
         logger.info("Websocket client disconnected")
@@ -270,6 +332,8 @@ async def websocket_chat(websocket: WebSocket):
             "type": "error",
             "message": "An error occured during chat interaction."
         })
+    finally:
+        connections.dec()
 
 
 
@@ -283,10 +347,13 @@ def read_root():
         "version": "1.0.0",
         "endpoints": {
             "health": "/health",
+            "metrics": "/metrics",
             "fourtytwo": "/api/mcp/fourty-two",
             "mcp-tools": "/api/mcp/tools",
             "mcp-resources": "/api/mcp/resources",
             "tasks": "/api/mcp/tasks",
+            "tasks-bulk": "/api/mcp/tasks/bulk",
+            "tasks-export": "/api/mcp/tasks/export",
             "chat": "/api/chat"
         }
     }
@@ -296,21 +363,30 @@ def read_root():
 async def health_check():
     """Health check endpoint."""
     logger.debug("Health check endpoint accessed")
-    mcp_status = "connected" if mcp_session else "disconnected"
     return {
         "status": "healthy",
         "service": "task-manager",
-        "mcp_status": mcp_status
+        "mcp_status": mcp_pool.state,
+        "mcp_pool": mcp_pool.stats(),
+        "tool_cache": tool_cache.stats(),
+        "llm_scheduler": llm_scheduler.stats(),
+        "broadcast": manager.stats()
     }
 
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus metrics endpoint."""
+    content, content_type = metrics.render()
+    return Response(content=content, media_type=content_type)
+
 @app.get("/api/mcp/fourty-two")
 async def get_fourty_two():
     """Invoke the MCP tool to return the number 42."""
     logger.debug("Invoking the MCP tool to get 42")
-    if not mcp_session:
+    if not await mcp_pool.wait_available():
         raise HTTPException(status_code=503, detail="MCP session not initialized")
     try:
-        result = await mcp_session.call_tool("return_fourty_two", arguments={})
+        result = await call_mcp_tool("return_fourty_two", arguments={})
         # The tool is expected to return a single text output with "42"
         return {"result": result.content[0].text}
     except Exception as e:
@@ -322,41 +398,41 @@ async def get_fourty_two():
 async def list_mcp_tools():
     """List all available MCP tools."""
     logger.debug("Listing MCP tools")
-    if not mcp_session:
-        raise HTTPException(status_code=503, detail="MCP session not initialized")
     try:
-        result = await mcp_session.list_tools()
-        return {
-            "tools": [
-                {
-                    "name": tool.name,
-                    "description": tool.description
-                } for tool in result.tools
-            ]
-        }
+        await tool_catalog.ensure_fresh()
+    except MCPUnavailableError:
+        raise HTTPException(status_code=503, detail="MCP session not initialized")
     except Exception as e:
         logger.error(f"Error listing MCP tools: {e}")
         raise HTTPException(status_code=500, detail="Failed to list MCP tools")
+    return {
+        "tools": [
+            {
+                "name": tool.name,
+                "description": tool.description
+            } for tool in tool_catalog.tools
+        ]
+    }
 
 @app.get("/api/mcp/resources")
 async def list_mcp_resources():
     """List all available MCP resources."""
-    if not mcp_session:
-        raise HTTPException(status_code=503, detail="MCP session not initialized")
     try:
-        result = await mcp_session.list_resources()
-        logger.debug(f"Resources: {result.resources}")
-        return {
-                "resources": [
-                    {
-                        "uri": resource.uri,
-                        "name": resource.name
-                    } for resource in result.resources
-                ]
-        }
+        await tool_catalog.ensure_fresh()
+    except MCPUnavailableError:
+        raise HTTPException(status_code=503, detail="MCP session not initialized")
     except Exception as e:
         logger.error(f"Error listing MCP resources: {e}")
         raise HTTPException(status_code=500, detail="Unable to list MCP resources")
+    logger.debug(f"Resources: {tool_catalog.resources}")
+    return {
+            "resources": [
+                {
+                    "uri": resource.uri,
+                    "name": resource.name
+                } for resource in tool_catalog.resources
+            ]
+    }
 
 # Add a task
 @app.post("/api/mcp/tasks")
@@ -364,10 +440,10 @@ async def create_task(task: Task):
     """Create a new task."""
     logger.debug(f"Creating task: {task.title}")
     logger.debug(f"  with description: {task.description}")
-    if not mcp_session:
+    if not await mcp_pool.wait_available():
         raise HTTPException(status_code=503, detail="MCP session not initialized")
     try:
-        result = await mcp_session.call_tool("create_task_tool",
+        result = await call_mcp_tool("create_task_tool",
             arguments={
                 "task": {
                     "title": task.title,
@@ -394,147 +470,352 @@ async def create_task(task: Task):
         raise HTTPException(status_code=500, detail="Failed to invoke MCP tool to create task")
     return task
 
+@app.post("/api/mcp/tasks/bulk")
+async def create_tasks_bulk(request: BulkTaskRequest):
+    """
+    Create many tasks in one transaction.
+
+    Invalid tasks are skipped (or, with "atomic", cause nothing to be
+    created) and reported in "errors" by their position in "tasks".
+    """
+    logger.debug(f"Creating {len(request.tasks)} tasks in bulk")
+    if not await mcp_pool.wait_available():
+        raise HTTPException(status_code=503, detail="MCP session not initialized")
+    try:
+        result = await call_mcp_tool("create_tasks_bulk_tool",
+            arguments={
+                "tasks": request.tasks,
+                "atomic": request.atomic
+            }
+        )
+        if result.isError:
+            error_content = result.content[0].text if result.content else "Unknown error"
+            logger.error(f"MCP tool returned error: {error_content}")
+            if "too many tasks" in error_content.lower():
+                raise HTTPException(status_code=413, detail=error_content)
+            raise HTTPException(status_code=500, detail="MCP tool error during bulk task creation")
+        content = json.loads(result.content[0].text)
+        logger.debug(f"Created {len(content['created'])} tasks, rejected {len(content['errors'])}")
+        return JSONResponse(content=content)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error invoking MCP tool to create tasks in bulk: {e}")
+        raise HTTPException(status_code=500, detail="Failed to invoke MCP tool to create tasks in bulk")
+
 @app.get("/api/mcp/tasks")
-async def get_tasks():
-    """Invoke the MCP tool to get all tasks."""
-    logger.debug("Invoking the MCP tool to get all tasks")
-    if not mcp_session:
+async def get_tasks(
+    status: Optional[TaskStatus] = Query(None, description="Only tasks with this status"),
+    due_after: Optional[datetime] = Query(None, description="Only tasks due at or after this time"),
+    due_before: Optional[datetime] = Query(None, description="Only tasks due at or before this time"),
+    q: Optional[str] = Query(None, description="Only tasks whose title or description contains this text"),
+    limit: int = Query(100, ge=1, description="Most tasks to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    skip: int = Query(0, ge=0, description="Number of matching tasks to skip, when not using cursor"),
+    count: str = Query("exact", pattern="^(exact|estimated|none)$", description="How to compute total")
+):
+    """
+    Invoke the MCP tool to get tasks, newest first, filtered and paginated.
+
+    Follow next_cursor from page to page; unlike skip, it costs the same
+    at any depth. count=estimated or count=none avoids counting every
+    matching row.
+    """
+    logger.debug("Invoking the MCP tool to get tasks")
+    if not await mcp_pool.wait_available():
         raise HTTPException(status_code=503, detail="MCP session not initialized")
+    arguments = {
+        "status": status.value if status else None,
+        "due_after": due_after.isoformat() if due_after else None,
+        "due_before": due_before.isoformat() if due_before else None,
+        "search": q,
+        "limit": limit,
+        "cursor": cursor,
+        "skip": skip or None,
+        "count": count if count != "exact" else None
+    }
     try:
-        result = await mcp_session.call_tool("get_tasks_tool", arguments={})
+        # Leave out unset filters so equal queries share a tool-cache entry
+        result = await call_mcp_tool("get_tasks_tool", arguments={
+            name: value for name, value in arguments.items() if value is not None
+        })
+        if result.isError:
+            error_content = result.content[0].text if result.content else "Unknown error"
+            logger.error(f"MCP tool returned error: {error_content}")
+            if "validation error" in error_content.lower() or "invalid cursor" in error_content.lower():
+                raise HTTPException(status_code=422, detail={
+                    "type": "validation_error",
+                    "message": error_content
+                })
+            raise HTTPException(status_code=500, detail="MCP tool error while getting tasks")
         logger.debug(f"Tasks retrieved: {result.content}")
         first_content = result.content[0] # should only be one text output returned
         text_data = first_content.text
 
         return JSONResponse(content=json.loads(text_data))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error invoking MCP tool: {e}")
         raise HTTPException(status_code=500, detail="Failed to invoke MCP tool")
 
+@app.get("/api/mcp/tasks/export")
+async def export_tasks(
+    status: Optional[TaskStatus] = Query(None, description="Only tasks with this status"),
+    due_after: Optional[datetime] = Query(None, description="Only tasks due at or after this time"),
+    due_before: Optional[datetime] = Query(None, description="Only tasks due at or before this time"),
+    q: Optional[str] = Query(None, description="Only tasks whose title or description contains this text")
+):
+    """
+    Stream every matching task as newline-delimited JSON, in id order.
+
+    An MCP tool result has to fit in one message, so the rows come from
+    the MCP server's /tasks/export route instead and are passed through
+    chunk by chunk as the database cursor yields them.
+    """
+    logger.debug("Exporting tasks")
+    if MCP_TRANSPORT == "inprocess":
+        server = load_inprocess_module()
+        chunks = server.export_task_chunks(status.value if status else None, due_after, due_before, q)
+        return StreamingResponse(chunks, media_type="application/x-ndjson")
+
+    params = {
+        "status": status.value if status else None,
+        "due_after": due_after.isoformat() if due_after else None,
+        "due_before": due_before.isoformat() if due_before else None,
+        "search": q
+    }
+    http = httpx.AsyncClient(timeout=httpx.Timeout(None, connect=10.0))
+    try:
+        upstream = await http.send(
+            http.build_request(
+                "GET", MCP_TASK_EXPORT_URL,
+                params={name: value for name, value in params.items() if value is not None},
+                headers=inject_context()
+            ),
+            stream=True
+        )
+    except httpx.HTTPError as e:
+        await http.aclose()
+        logger.error(f"Error reaching the MCP server task export: {e}")
+        raise HTTPException(status_code=503, detail="MCP server unavailable")
+    if upstream.status_code != 200:
+        error_content = (await upstream.aread()).decode(errors="replace")
+        await upstream.aclose()
+        await http.aclose()
+        logger.error(f"MCP server task export failed: {upstream.status_code} {error_content}")
+        if upstream.status_code == 422:
+            raise HTTPException(status_code=422, detail={
+                "type": "validation_error",
+                "message": error_content
+            })
+        raise HTTPException(status_code=500, detail="MCP server error while exporting tasks")
+
+    async def relay():
+        try:
+            async for chunk in upstream.aiter_raw():
+                yield chunk
+        finally:
+            await upstream.aclose()
+            await http.aclose()
+
+    return StreamingResponse(relay(), media_type="application/x-ndjson")
+
 @app.post("/api/chat")
-async def chat(request: ChatRequest):
+async def chat(request: ChatRequest, http_request: Request):
     """
     Chat endpoint that uses Clause to interact with MCP tools.
 
     Request body:
     {
         "message": "Create a task to buy groceries",
-        "conversation_history": [] # Optional
+        "session_id": "..." # Optional, from the previous response
     }
+
+    The conversation is kept on the server under the returned session_id,
+    so follow-up requests only send the new message. Requests without a
+    session_id may still send "conversation_history" and get the updated
+    history back.
     """
-    if not mcp_session:
+    if not await mcp_pool.wait_available():
         raise HTTPException(status_code=503, detail="MCP session not initialized")
-    try:
-        # Build prompt for Claude
+    if request.session_id:
+        session_id = request.session_id
+        messages = await conversation_store.get(session_id)
+        if messages is None:
+            raise HTTPException(status_code=404, detail="Unknown or expired session_id")
+    else:
+        session_id = uuid.uuid4().hex
         messages = request.conversation_history or []
-        messages.append({
-            "role": "user",
-            "content": request.message
-        })
-        response = anthropic_client.messages.create(
-            model=getenv("ANTHROPIC_MODEL", "claude-sonnet-4-5-20250929"),
-            max_tokens=4096,
-            tools=MCP_TOOLS,
-            messages=messages
-        )
-        # process tool calls in a loop
-        while response.stop_reason == "tool_use":
-            # Extract tool use from response
-            tool_use_block = next(
-                block for block in response.content if block.type == "tool_use"
-            )
-            # Call the requested MCP tool
-            tool_result = await execute_mcp_tool(
-                tool_use_block.name,
-                tool_use_block.input
-            )
-            # Add assistant's response and tool result to messages
-            messages.append({
-                "role": "assistant",
-                "content": [block.model_dump() for block in response.content]
-            })
+    try:
+        with tracer.start_as_current_span(
+            "chat turn",
+            attributes={"chat.endpoint": "/api/chat", "chat.session_id": session_id}
+        ) as span:
+            # Build prompt for Claude
             messages.append({
                 "role": "user",
-                "content": [
-                    {
-                        "type": "tool_result",
-                        "tool_use_id": tool_use_block.id,
-                        "content": tool_result
-                    }
-                ]
+                "content": request.message
             })
-            # Get new response from Claude
-            response = anthropic_client.messages.create(
-                model=getenv("ANTHROPIC_MODEL", "claude-sonnet-4-5-20250929"),
-                max_tokens=4096,
-                tools=MCP_TOOLS,
-                messages=messages
+            usage = llm.TurnUsage()
+            # Calls are queued fairly per client address
+            client_id = http_request.client.host if http_request.client else "unknown"
+            messages = await conversation.compact(messages, client_id, usage)
+            async with llm_scheduler.slot(client_id):
+                response = await llm.create_message(messages, await tool_catalog.anthropic_tools(), usage)
+            # process tool calls in a loop
+            iterations = 0
+            while response.stop_reason == "tool_use":
+                iterations += 1
+                # Extract tool uses from response
+                tool_use_blocks = [
+                    block for block in response.content if block.type == "tool_use"
+                ]
+                # Call all requested MCP tools concurrently
+                tool_results = await execute_tool_uses(tool_use_blocks)
+                # Add assistant's response and tool results to messages
+                messages.append({
+                    "role": "assistant",
+                    "content": [block.model_dump() for block in response.content]
+                })
+                messages.append({
+                    "role": "user",
+                    "content": tool_results
+                })
+                # Get new response from Claude
+                async with llm_scheduler.slot(client_id, can_reject=False):
+                    response = await llm.create_message(messages, await tool_catalog.anthropic_tools(), usage)
+            # Extract final response from Claude
+            usage.log()
+            metrics.observe_turn("/api/chat", usage, iterations)
+            span.set_attribute("chat.tool_iterations", iterations)
+            final_text = next(
+                (block.text for block in response.content if hasattr(block, "text")),
+                "I've completed your request."
             )
-        # Extract final response from Claude
-        final_response = next(
-            (block for block in response.content if hasattr(block, "text")),
-            "I've completed your request."
-        )
-        fun_response = {
-            "response": final_response.text,
-            "conversation_history": messages + [{"role": "assistant", "content": response.content[0].text}]
-        }
-        logger.info(f"Chat response: \n{json.dumps(fun_response, indent=2)}")
-
-        return JSONResponse(content={
-            "response": final_response.text,
-            "conversation_history": messages + [{"role": "assistant", "content": response.content[0].text}]
-        })
+            messages.append({"role": "assistant", "content": final_text})
+            await conversation_store.put(session_id, messages)
+            logger.info(f"Chat response for session {session_id}: {final_text}")
 
+            content = {
+                "response": final_text,
+                "session_id": session_id
+            }
+            if not request.session_id:
+                content["conversation_history"] = messages
+            return JSONResponse(content=content)
+
+    except SchedulerBusyError as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
     except Exception as e:
         logger.error(f"Error during chat interaction: {e}")
         raise HTTPException(status_code=500, detail="Chat interaction failed")
 
-async def execute_mcp_tool(tool_name: str, tool_input: Dict[str, Any]) -> str:
-    """Helper function to execute an MCP tool and return the result as a string."""
-    if not mcp_session:
-        raise HTTPException(status_code=503, detail="MCP session not initialized")
-    try:
-        # Map tool names to MCP tool names
-        tool_mapping = {
-            "return_fourty_two": "return_fourty_two",
-            "create_task_tool": "create_task_tool"
-        }
-        mcp_tool_name = tool_mapping.get(tool_name)
-        if not mcp_tool_name:
-            logger.error(f"Unknown tool requested {tool_name}")
-            return "Unknown tool requested."
-        if tool_name == "return_fourty_two":
-            result = await mcp_session.call_tool(mcp_tool_name, arguments={})
-        elif tool_name == "create_task_tool":
-            logger.debug(f"Executing create_task_tool with input: {tool_input}")
-            result = await mcp_session.call_tool(
-                mcp_tool_name,
-                arguments=tool_input
-            )
-            logger.debug(f"create_task_tool result: {result}")
-        else:
-            logger.error(f"Tool {tool_name} not implemented in execute_mcp_tool")
-            return "Tool not implemented."
-
-        if result.isError:
-            error_content = result.content[0].text if result.content else "Unknown error"
-            logger.error(f"MCP tool returned error: {error_content}")
-            return f"Error executing tool {tool_name}: {error_content}"
-
-        logger.debug(f"Tool {tool_name} executed successfully with result: {result.content}")
-        return result.content[0].text if result.content else "No content returned from tool."
-    except Exception as e:
-        logger.error(f"Error executing MCP tool {tool_name}: {e}")
-        return f"Exception occurred while executing tool {tool_name}."
-
-
-
-
-
-
+async def call_mcp_tool(tool_name: str, arguments: Dict[str, Any]):
+    """
+    Call an MCP tool through the tool-result cache.
 
+    Results of read-only tools are served from the cache while fresh.
+    A successful call of any other tool may have changed data, so it
+    invalidates every cached read.
+    """
+    ttl = await tool_catalog.cache_ttl(tool_name) if TOOL_CACHE_ENABLED else None
+    if ttl is not None:
+        cached = tool_cache.get(tool_name, arguments)
+        if cached is not None:
+            logger.debug(f"Tool cache hit for {tool_name}")
+            trace.get_current_span().set_attribute("tool.cache_hit", True)
+            return cached
+    generation = tool_cache.generation
+    result = await mcp_pool.call_tool(tool_name, arguments=arguments)
+    if not result.isError:
+        if ttl is not None:
+            tool_cache.put(tool_name, arguments, result, ttl, generation)
+        elif not await tool_catalog.is_read_only(tool_name):
+            tool_cache.invalidate()
+    return result
 
+async def execute_mcp_tool(tool_name: str, tool_input: Dict[str, Any]) -> str:
+    """Helper function to execute an MCP tool and return the result as a string."""
+    if not await mcp_pool.wait_available():
+        raise MCPUnavailableError("MCP session not initialized")
+    with tracer.start_as_current_span("execute_mcp_tool", attributes={"mcp.tool.name": tool_name}) as span:
+        start = time.perf_counter()
+        try:
+            if not await tool_catalog.has_tool(tool_name):
+                logger.error(f"Unknown tool requested {tool_name}")
+                # Don't label metrics with whatever name the model made up
+                span.set_status(trace.Status(trace.StatusCode.ERROR))
+                metrics.TOOL_CALLS.labels(tool="unknown", outcome="error").inc()
+                return "Unknown tool requested."
+            logger.debug(f"Executing {tool_name} with input: {tool_input}")
+            result = await call_mcp_tool(tool_name, arguments=tool_input or {})
+            logger.debug(f"{tool_name} result: {result}")
+
+            if result.isError:
+                error_content = result.content[0].text if result.content else "Unknown error"
+                logger.error(f"MCP tool returned error: {error_content}")
+                span.set_status(trace.Status(trace.StatusCode.ERROR))
+                metrics.observe_tool_call(tool_name, "error", time.perf_counter() - start)
+                return f"Error executing tool {tool_name}: {error_content}"
+
+            logger.debug(f"Tool {tool_name} executed successfully with result: {result.content}")
+            metrics.observe_tool_call(tool_name, "ok", time.perf_counter() - start)
+            return result.content[0].text if result.content else "No content returned from tool."
+        except Exception as e:
+            logger.error(f"Error executing MCP tool {tool_name}: {e}")
+            span.record_exception(e)
+            span.set_status(trace.Status(trace.StatusCode.ERROR))
+            metrics.observe_tool_call(tool_name, "error", time.perf_counter() - start)
+            return f"Exception occurred while executing tool {tool_name}."
+
+async def execute_tool_uses(
+    tool_use_blocks: List[Any],
+    on_result: Optional[Callable[[Any, str], Awaitable[None]]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Execute every tool_use block of a model response concurrently.
 
+    At most TOOL_PARALLELISM tools run at once and each is given
+    TOOL_TIMEOUT_SECONDS to finish; one that times out, or finds the MCP
+    server unavailable, gets an error tool_result. Returns the tool_result
+    blocks in the same order as the tool_use blocks, ready to send back in
+    one user message.
+    """
+    semaphore = asyncio.Semaphore(TOOL_PARALLELISM)
 
+    async def run(tool_use_block) -> Dict[str, Any]:
+        async with semaphore:
+            tool_result_block = {
+                "type": "tool_result",
+                "tool_use_id": tool_use_block.id
+            }
+            try:
+                tool_result = await asyncio.wait_for(
+                    execute_mcp_tool(tool_use_block.name, tool_use_block.input),
+                    timeout=TOOL_TIMEOUT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                logger.error(f"MCP tool {tool_use_block.name} timed out after {TOOL_TIMEOUT_SECONDS}s")
+                # Don't label metrics with whatever name the model made up
+                tool_name = tool_use_block.name if await tool_catalog.has_tool(tool_use_block.name) else "unknown"
+                metrics.observe_tool_call(tool_name, "timeout", TOOL_TIMEOUT_SECONDS)
+                tool_result = f"Tool {tool_use_block.name} timed out."
+                tool_result_block["is_error"] = True
+            except MCPUnavailableError:
+                # Let the model answer without the tool rather than failing the turn
+                logger.error(f"MCP tool {tool_use_block.name} not run, MCP server unavailable")
+                tool_result = f"Tool {tool_use_block.name} is unavailable, the MCP server can't be reached."
+                tool_result_block["is_error"] = True
+        tool_result_block["content"] = tool_result
+        if on_result:
+            await on_result(tool_use_block, tool_result)
+        return tool_result_block
+
+    logger.debug(f"Executing {len(tool_use_blocks)} tool calls")
+    return list(await asyncio.gather(*(run(block) for block in tool_use_blocks)))
 
@@ -0,0 +1,109 @@
+from fastapi import WebSocket
+from typing import Optional, Dict, Any
+from os import getenv
+import asyncio
+
+import log_setup as log_setup
+
+logger = log_setup.configure_logging()
+
+# Messages buffered per connection before the slow-consumer policy applies
+BROADCAST_QUEUE_SIZE = int(getenv("BROADCAST_QUEUE_SIZE", "100"))
+# "drop_oldest" discards the oldest buffered message, "disconnect" drops the client
+BROADCAST_SLOW_CONSUMER_POLICY = getenv("BROADCAST_SLOW_CONSUMER_POLICY", "drop_oldest").lower()
+# A single send taking longer than this marks the connection as dead
+BROADCAST_SEND_TIMEOUT_SECONDS = float(getenv("BROADCAST_SEND_TIMEOUT_SECONDS", "10"))
+
+class ClientConnection:
+    """A websocket with its own bounded send queue and sender task."""
+    def __init__(self, websocket: WebSocket, queue_size: int):
+        self.websocket = websocket
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.sender: Optional[asyncio.Task] = None
+
+class ConnectionManager:
+    """
+    Manages WebSocket connections for real-time chat communication.
+
+    Broadcasting only puts the message on each connection's bounded queue;
+    a sender task per connection delivers it, so a slow or stalled client
+    never holds up the others. When a client's queue is full, the
+    slow-consumer policy either drops its oldest message or disconnects it.
+    Connections whose sends fail or time out are removed.
+    """
+    def __init__(
+        self,
+        queue_size: int = BROADCAST_QUEUE_SIZE,
+        slow_consumer_policy: str = BROADCAST_SLOW_CONSUMER_POLICY,
+        send_timeout: float = BROADCAST_SEND_TIMEOUT_SECONDS
+    ):
+        self.queue_size = queue_size
+        self.slow_consumer_policy = slow_consumer_policy
+        self.send_timeout = send_timeout
+        self.active_connections: Dict[WebSocket, ClientConnection] = {}
+        self.dropped_messages = 0
+        self.slow_consumer_disconnects = 0
+        self.dead_connections = 0
+        # Keeps fire-and-forget close tasks referenced until they finish
+        self._closing: set[asyncio.Task] = set()
+
+    async def connect(self, websocket: WebSocket):
+        """Accepts a new websocket connection"""
+        await websocket.accept()
+        client = ClientConnection(websocket, self.queue_size)
+        client.sender = asyncio.create_task(self._send_loop(client))
+        self.active_connections[websocket] = client
+
+    def disconnect(self, websocket: WebSocket):
+        """Removes a websocket connection from the active connections list"""
+        client = self.active_connections.pop(websocket, None)
+        if client and client.sender and client.sender is not asyncio.current_task():
+            client.sender.cancel()
+
+    async def broadcast(self, message: str):
+        """Queues a message for every active connection without waiting on delivery"""
+        for client in list(self.active_connections.values()):
+            if client.queue.full():
+                if self.slow_consumer_policy == "disconnect":
+                    logger.warning("Disconnecting slow websocket consumer")
+                    self.slow_consumer_disconnects += 1
+                    self.disconnect(client.websocket)
+                    task = asyncio.create_task(self._close(client.websocket))
+                    self._closing.add(task)
+                    task.add_done_callback(self._closing.discard)
+                    continue
+                client.queue.get_nowait()
+                client.dropped += 1
+                self.dropped_messages += 1
+            client.queue.put_nowait(message)
+
+    async def _send_loop(self, client: ClientConnection):
+        try:
+            while True:
+                message = await client.queue.get()
+                # Unlike wait_for, no extra task per send
+                async with asyncio.timeout(self.send_timeout):
+                    await client.websocket.send_text(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"Removing dead websocket connection: {e!r}")
+            self.dead_connections += 1
+            self.disconnect(client.websocket)
+
+    async def _close(self, websocket: WebSocket):
+        try:
+            await websocket.close()
+        except Exception:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Fan-out counters for the health endpoint."""
+        return {
+            "connections": len(self.active_connections),
+            "queued_messages": sum(client.queue.qsize() for client in self.active_connections.values()),
+            "dropped_messages": self.dropped_messages,
+            "slow_consumer_disconnects": self.slow_consumer_disconnects,
+            "dead_connections": self.dead_connections
+        }
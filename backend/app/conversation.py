@@ -0,0 +1,104 @@
+from typing import List, Dict, Any, Optional
+from os import getenv
+import json
+
+import log_setup as log_setup
+import llm
+from llm_scheduler import llm_scheduler
+
+logger = log_setup.configure_logging()
+
+# Approximate token budget for the history kept per conversation
+CONVERSATION_TOKEN_BUDGET = int(getenv("CONVERSATION_TOKEN_BUDGET", "50000"))
+# "drop" forgets the oldest turns, "summarize" replaces them with an LLM-written summary
+CONVERSATION_COMPACTION = getenv("CONVERSATION_COMPACTION", "drop").lower()
+# Characters per token used for the cheap local token estimate
+CHARS_PER_TOKEN = float(getenv("CHARS_PER_TOKEN", "4"))
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:"
+
+def estimate_tokens(messages: List[Dict[str, Any]]) -> int:
+    """Rough token count of `messages`, without a round trip to the API."""
+    return int(len(json.dumps(messages, default=str)) / CHARS_PER_TOKEN)
+
+def is_turn_start(message: Dict[str, Any]) -> bool:
+    """Whether `message` is a user message that starts a turn rather than returning tool results."""
+    if message["role"] != "user":
+        return False
+    content = message["content"]
+    if isinstance(content, str):
+        return True
+    return not any(block.get("type") == "tool_result" for block in content)
+
+def turn_starts(messages: List[Dict[str, Any]]) -> List[int]:
+    """Indexes of the messages that start a turn."""
+    return [index for index, message in enumerate(messages) if is_turn_start(message)]
+
+async def summarize(
+    messages: List[Dict[str, Any]],
+    client_id: str,
+    usage: Optional[llm.TurnUsage] = None
+) -> str:
+    """
+    Ask the model for a short summary of `messages`.
+
+    The call is part of `client_id`'s turn: it waits for an LLM scheduler
+    slot like the turn's other calls and adds its tokens to `usage`.
+    """
+    transcript = json.dumps(messages, default=str)
+    async with llm_scheduler.slot(client_id, can_reject=False):
+        response = await llm.create_message([{
+            "role": "user",
+            "content": (
+                "Summarize this conversation between a user and a task manager assistant in a few "
+                "sentences. Keep task titles, IDs, due dates and any open questions.\n\n" + transcript
+            )
+        }], tools=[], usage=usage)
+    return next((block.text for block in response.content if block.type == "text"), "")
+
+async def compact(
+    messages: List[Dict[str, Any]],
+    client_id: str,
+    usage: Optional[llm.TurnUsage] = None,
+    budget: int = CONVERSATION_TOKEN_BUDGET,
+    mode: str = CONVERSATION_COMPACTION
+) -> List[Dict[str, Any]]:
+    """
+    Trim `messages` to roughly `budget` tokens by removing whole turns.
+
+    Turns are removed oldest first, so every tool_use stays next to its
+    tool_result and the history still starts with a user message. The most
+    recent turn is always kept. In "summarize" mode the removed turns are
+    replaced by a single user message holding a summary of them; an older
+    summary is folded into the next one. The summary call is made for
+    `client_id` and counted in `usage`, see summarize().
+    """
+    sizes = [estimate_tokens([message]) for message in messages]
+    total = sum(sizes)
+    if total <= budget:
+        return messages
+    starts = turn_starts(messages)
+    # Drop turns until the rest fits, never touching the latest turn
+    cut = None
+    remaining = total
+    for start in starts[1:]:
+        remaining -= sum(sizes[cut or 0:start])
+        cut = start
+        if remaining <= budget:
+            break
+    if cut is None:
+        return messages
+
+    dropped, kept = messages[:cut], messages[cut:]
+    logger.info(
+        f"Compacting conversation: dropping {len(dropped)} of {len(messages)} messages "
+        f"(~{total} tokens, budget {budget})"
+    )
+    if mode != "summarize":
+        return kept
+    try:
+        summary = await summarize(dropped, client_id, usage)
+    except Exception as e:
+        logger.error(f"Failed to summarize conversation, dropping turns instead: {e}")
+        return kept
+    return [{"role": "user", "content": f"{SUMMARY_PREFIX} {summary}"}] + kept
@@ -0,0 +1,109 @@
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any
+from os import getenv
+import json
+import time
+
+import log_setup as log_setup
+
+logger = log_setup.configure_logging()
+
+# "memory" keeps conversations in this process, "redis" shares them between workers
+CONVERSATION_STORE = getenv("CONVERSATION_STORE", "memory").lower()
+CONVERSATION_STORE_MAX_SESSIONS = int(getenv("CONVERSATION_STORE_MAX_SESSIONS", "1000"))
+CONVERSATION_STORE_TTL_SECONDS = float(getenv("CONVERSATION_STORE_TTL_SECONDS", "3600"))
+REDIS_URL = getenv("REDIS_URL", "redis://localhost:6379/0")
+
+class MemoryConversationStore:
+    """
+    In-process conversation store with LRU and TTL eviction.
+
+    Holds at most `max_sessions` conversations; the least recently used one
+    is evicted first, and a conversation untouched for `ttl` seconds expires.
+    """
+    def __init__(
+        self,
+        max_sessions: int = CONVERSATION_STORE_MAX_SESSIONS,
+        ttl: float = CONVERSATION_STORE_TTL_SECONDS
+    ):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: OrderedDict[str, tuple[float, List[Dict[str, Any]]]] = OrderedDict()
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        # Entries are in last-used order, so expired ones are at the front
+        while self._sessions:
+            session_id, (expires_at, _) = next(iter(self._sessions.items()))
+            if expires_at > now:
+                break
+            del self._sessions[session_id]
+
+    async def get(self, session_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Return the stored conversation, or None if unknown or expired."""
+        self._evict_expired()
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        # Reading a conversation counts as using it
+        self._sessions[session_id] = (time.monotonic() + self.ttl, entry[1])
+        self._sessions.move_to_end(session_id)
+        return list(entry[1])
+
+    async def put(self, session_id: str, messages: List[Dict[str, Any]]):
+        """Store a conversation, evicting the least recently used one when full."""
+        self._sessions[session_id] = (time.monotonic() + self.ttl, messages)
+        self._sessions.move_to_end(session_id)
+        self._evict_expired()
+        while len(self._sessions) > self.max_sessions:
+            evicted, _ = self._sessions.popitem(last=False)
+            logger.debug(f"Evicted conversation {evicted}")
+
+    async def delete(self, session_id: str):
+        """Forget a conversation."""
+        self._sessions.pop(session_id, None)
+
+    async def close(self):
+        pass
+
+class RedisConversationStore:
+    """
+    Conversation store in Redis (or any Redis-compatible server).
+
+    Lets several uvicorn workers serve the same sessions. Each conversation
+    is one JSON value whose TTL is renewed on every write; Redis' own
+    maxmemory policy takes care of size-bound eviction.
+    """
+    def __init__(self, url: str = REDIS_URL, ttl: float = CONVERSATION_STORE_TTL_SECONDS):
+        import redis.asyncio as redis
+        self.ttl = ttl
+        self._redis = redis.from_url(url)
+
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return f"conversation:{session_id}"
+
+    async def get(self, session_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Return the stored conversation, or None if unknown or expired."""
+        value = await self._redis.get(self._key(session_id))
+        return json.loads(value) if value is not None else None
+
+    async def put(self, session_id: str, messages: List[Dict[str, Any]]):
+        """Store a conversation and renew its TTL."""
+        await self._redis.set(self._key(session_id), json.dumps(messages, default=str), ex=int(self.ttl))
+
+    async def delete(self, session_id: str):
+        """Forget a conversation."""
+        await self._redis.delete(self._key(session_id))
+
+    async def close(self):
+        await self._redis.aclose()
+
+def make_store():
+    """Build the conversation store selected by CONVERSATION_STORE."""
+    if CONVERSATION_STORE == "redis":
+        logger.info(f"Using Redis conversation store at {REDIS_URL}")
+        return RedisConversationStore()
+    return MemoryConversationStore()
+
+conversation_store = make_store()
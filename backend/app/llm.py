@@ -0,0 +1,138 @@
+import anthropic
+import httpx
+from typing import List, Dict, Any
+from os import getenv
+import time
+
+import log_setup as log_setup
+import metrics
+from tracing import tracer
+
+logger = log_setup.configure_logging()
+
+ANTHROPIC_MODEL = getenv("ANTHROPIC_MODEL", "claude-sonnet-4-5-20250929")
+ANTHROPIC_MAX_TOKENS = int(getenv("ANTHROPIC_MAX_TOKENS", "4096"))
+
+# HTTP client tuning for the shared connection pool
+ANTHROPIC_TIMEOUT_SECONDS = float(getenv("ANTHROPIC_TIMEOUT_SECONDS", "120"))
+ANTHROPIC_CONNECT_TIMEOUT_SECONDS = float(getenv("ANTHROPIC_CONNECT_TIMEOUT_SECONDS", "5"))
+ANTHROPIC_MAX_CONNECTIONS = int(getenv("ANTHROPIC_MAX_CONNECTIONS", "100"))
+ANTHROPIC_MAX_KEEPALIVE = int(getenv("ANTHROPIC_MAX_KEEPALIVE", "20"))
+ANTHROPIC_MAX_RETRIES = int(getenv("ANTHROPIC_MAX_RETRIES", "2"))
+
+# Mark the tool definitions and conversation prefix as cacheable prompt prefixes
+ANTHROPIC_PROMPT_CACHING = getenv("ANTHROPIC_PROMPT_CACHING", "true").lower() == "true"
+CACHE_CONTROL = {"type": "ephemeral"}
+
+def make_client(http_client: httpx.AsyncClient | None = None) -> anthropic.AsyncAnthropic:
+    """Build an async Anthropic client backed by one pooled HTTP client."""
+    timeout = httpx.Timeout(ANTHROPIC_TIMEOUT_SECONDS, connect=ANTHROPIC_CONNECT_TIMEOUT_SECONDS)
+    if http_client is None:
+        http_client = anthropic.DefaultAsyncHttpxClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=ANTHROPIC_MAX_CONNECTIONS,
+                max_keepalive_connections=ANTHROPIC_MAX_KEEPALIVE
+            )
+        )
+    return anthropic.AsyncAnthropic(
+        http_client=http_client,
+        timeout=timeout,
+        max_retries=ANTHROPIC_MAX_RETRIES
+    )
+
+# Shared by every chat path so all turns reuse the same connection pool
+anthropic_client = make_client()
+
+class TurnUsage:
+    """Token usage summed over every model call made for one chat turn."""
+    def __init__(self):
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_read_input_tokens = 0
+        self.cache_creation_input_tokens = 0
+
+    def add(self, usage):
+        """Add the usage block of one Messages API response."""
+        self.calls += 1
+        self.input_tokens += usage.input_tokens
+        self.output_tokens += usage.output_tokens
+        self.cache_read_input_tokens += usage.cache_read_input_tokens or 0
+        self.cache_creation_input_tokens += usage.cache_creation_input_tokens or 0
+
+    def log(self):
+        """Log the turn's token counts, including prompt cache hits and misses."""
+        logger.info(
+            f"Turn usage: {self.calls} calls, "
+            f"input={self.input_tokens} output={self.output_tokens} "
+            f"cache_read={self.cache_read_input_tokens} "
+            f"cache_write={self.cache_creation_input_tokens}"
+        )
+
+def cacheable_tools(tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Copy of `tools` with a cache breakpoint after the last tool definition."""
+    if not ANTHROPIC_PROMPT_CACHING or not tools:
+        return tools
+    return tools[:-1] + [{**tools[-1], "cache_control": CACHE_CONTROL}]
+
+def cacheable_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Copy of `messages` with a cache breakpoint on the last content block.
+
+    The prefix written to the cache by one call is read back by the next
+    tool-loop iteration or turn, which only appends to the conversation.
+    Only the request copy is marked so stored history never accumulates
+    more breakpoints than the API allows.
+    """
+    if not ANTHROPIC_PROMPT_CACHING or not messages:
+        return messages
+    last = messages[-1]
+    content = last["content"]
+    if isinstance(content, str):
+        content = [{"type": "text", "text": content}]
+    if not content:
+        return messages
+    content = content[:-1] + [{**content[-1], "cache_control": CACHE_CONTROL}]
+    return messages[:-1] + [{**last, "content": content}]
+
+def set_usage_attributes(span, response):
+    """Record a response's stop reason and token counts on its span."""
+    span.set_attribute("llm.stop_reason", response.stop_reason or "")
+    span.set_attribute("llm.input_tokens", response.usage.input_tokens)
+    span.set_attribute("llm.output_tokens", response.usage.output_tokens)
+
+async def create_message(
+    messages: List[Dict[str, Any]],
+    tools: List[Dict[str, Any]],
+    usage: TurnUsage | None = None
+):
+    """Send one Messages API request without blocking the event loop."""
+    logger.debug(f"Sending {len(messages)} messages to {ANTHROPIC_MODEL}")
+    start = time.perf_counter()
+    with tracer.start_as_current_span("anthropic.messages.create", attributes={"llm.model": ANTHROPIC_MODEL}) as span:
+        response = await anthropic_client.messages.create(
+            model=ANTHROPIC_MODEL,
+            max_tokens=ANTHROPIC_MAX_TOKENS,
+            tools=cacheable_tools(tools),
+            messages=cacheable_messages(messages)
+        )
+        set_usage_attributes(span, response)
+    metrics.LLM_CALL_SECONDS.labels(mode="create").observe(time.perf_counter() - start)
+    if usage:
+        usage.add(response.usage)
+    return response
+
+def stream_message(messages: List[Dict[str, Any]], tools: List[Dict[str, Any]]):
+    """Open a streaming Messages API request; use as `async with`."""
+    logger.debug(f"Streaming {len(messages)} messages from {ANTHROPIC_MODEL}")
+    return anthropic_client.messages.stream(
+        model=ANTHROPIC_MODEL,
+        max_tokens=ANTHROPIC_MAX_TOKENS,
+        tools=cacheable_tools(tools),
+        messages=cacheable_messages(messages)
+    )
+
+async def close():
+    """Close the shared HTTP connection pool."""
+    await anthropic_client.close()
@@ -0,0 +1,131 @@
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Dict, Any
+from os import getenv
+import asyncio
+
+import log_setup as log_setup
+
+logger = log_setup.configure_logging()
+
+LLM_MAX_CONCURRENCY = int(getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_MAX_QUEUE_DEPTH = int(getenv("LLM_MAX_QUEUE_DEPTH", "64"))
+LLM_MAX_QUEUED_PER_CLIENT = int(getenv("LLM_MAX_QUEUED_PER_CLIENT", "2"))
+LLM_BUSY_RETRY_AFTER_SECONDS = int(getenv("LLM_BUSY_RETRY_AFTER_SECONDS", "2"))
+
+class SchedulerBusyError(Exception):
+    """Raised instead of queueing when the LLM call queue is too deep."""
+    def __init__(self, retry_after: int = LLM_BUSY_RETRY_AFTER_SECONDS):
+        super().__init__("Too many LLM calls queued, try again shortly")
+        self.retry_after = retry_after
+
+class LLMScheduler:
+    """
+    Global limit on concurrent LLM calls with per-client fair queuing.
+
+    At most `max_concurrency` calls run at once. When all slots are busy,
+    callers wait in a FIFO queue per client, and freed slots go to the
+    clients in round-robin order, so one chatty client can't starve the
+    others. A caller that would push the total queue past `max_queue_depth`,
+    or its own client's queue past `max_queued_per_client`, is turned away
+    with SchedulerBusyError right away instead of waiting.
+    """
+    def __init__(
+        self,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        max_queue_depth: int = LLM_MAX_QUEUE_DEPTH,
+        max_queued_per_client: int = LLM_MAX_QUEUED_PER_CLIENT
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue_depth = max_queue_depth
+        self.max_queued_per_client = max_queued_per_client
+        self.active = 0
+        self.queued = 0
+        self.granted = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        # Waiters per client; iteration order is the round-robin order
+        self._queues: OrderedDict[str, deque[asyncio.Future]] = OrderedDict()
+
+    @asynccontextmanager
+    async def slot(self, client_id: str, can_reject: bool = True):
+        """
+        Hold one LLM call slot for the duration of the block.
+
+        Pass `can_reject=False` for follow-up calls of a turn that has
+        already started, so a turn is never cut off halfway through.
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        if self.active < self.max_concurrency and not self.queued:
+            self.active += 1
+        else:
+            queue = self._queues.get(client_id)
+            if can_reject and (
+                self.queued >= self.max_queue_depth
+                or (queue is not None and len(queue) >= self.max_queued_per_client)
+            ):
+                self.rejected += 1
+                logger.warning(f"LLM scheduler busy, rejecting call from {client_id}")
+                raise SchedulerBusyError()
+            await self._wait_turn(client_id, loop.create_future())
+        wait = loop.time() - start
+        self.granted += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _wait_turn(self, client_id: str, waiter: asyncio.Future):
+        self._queues.setdefault(client_id, deque()).append(waiter)
+        self.queued += 1
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we were cancelled
+                self._release()
+            else:
+                self._remove_waiter(client_id, waiter)
+            raise
+
+    def _remove_waiter(self, client_id: str, waiter: asyncio.Future):
+        queue = self._queues.get(client_id)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            self.queued -= 1
+            if not queue:
+                del self._queues[client_id]
+
+    def _release(self):
+        # Hand the slot straight to the next client in round-robin order
+        while self._queues:
+            client_id, queue = next(iter(self._queues.items()))
+            waiter = queue.popleft()
+            self.queued -= 1
+            if queue:
+                self._queues.move_to_end(client_id)
+            else:
+                del self._queues[client_id]
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and wait times for the health endpoint."""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": self.active,
+            "queued": self.queued,
+            "queued_clients": len(self._queues),
+            "granted": self.granted,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(1000 * self.total_wait / self.granted, 1) if self.granted else 0.0,
+            "max_wait_ms": round(1000 * self.max_wait, 1)
+        }
+
+llm_scheduler = LLMScheduler()
@@ -0,0 +1,408 @@
+from mcp import ClientSession, types
+from mcp.client.sse import sse_client
+from mcp.client.streamable_http import streamable_http_client
+from opentelemetry.trace import SpanKind
+from contextlib import asynccontextmanager
+from typing import Optional, List, Dict, Any, Callable, Awaitable
+from os import getenv, path
+import asyncio
+import importlib
+import random
+import sys
+
+import log_setup as log_setup
+from tracing import tracer, inject_context
+
+logger = log_setup.configure_logging()
+
+# "sse", "streamable-http", or "inprocess" to run the MCP server's FastMCP
+# instance inside the backend over in-memory streams
+MCP_TRANSPORT = getenv("MCP_TRANSPORT", "sse").lower()
+MCP_SERVER_URL = getenv(
+    "MCP_SERVER_URL",
+    "http://mcp-server:8001/mcp" if MCP_TRANSPORT == "streamable-http" else "http://mcp-server:8001/sse"
+)
+# Directory holding the MCP server's server.py, for the inprocess transport
+MCP_SERVER_APP_DIR = getenv(
+    "MCP_SERVER_APP_DIR",
+    path.join(path.dirname(path.abspath(__file__)), "..", "..", "mcp-server", "app")
+)
+MCP_POOL_SIZE = int(getenv("MCP_POOL_SIZE", "4"))
+MCP_SESSION_MAX_IN_FLIGHT = int(getenv("MCP_SESSION_MAX_IN_FLIGHT", "8"))
+MCP_CHECKOUT_TIMEOUT_SECONDS = float(getenv("MCP_CHECKOUT_TIMEOUT_SECONDS", "10"))
+MCP_HEALTH_CHECK_INTERVAL_SECONDS = float(getenv("MCP_HEALTH_CHECK_INTERVAL_SECONDS", "15"))
+MCP_HEALTH_CHECK_TIMEOUT_SECONDS = float(getenv("MCP_HEALTH_CHECK_TIMEOUT_SECONDS", "5"))
+MCP_RECONNECT_BASE_DELAY_SECONDS = float(getenv("MCP_RECONNECT_BASE_DELAY_SECONDS", "0.5"))
+MCP_RECONNECT_MAX_DELAY_SECONDS = float(getenv("MCP_RECONNECT_MAX_DELAY_SECONDS", "30"))
+MCP_RECONNECT_PARK_SECONDS = float(getenv("MCP_RECONNECT_PARK_SECONDS", "5"))
+
+class MCPUnavailableError(Exception):
+    """Raised when no healthy MCP session can be checked out."""
+
+def load_inprocess_module():
+    """
+    Import the MCP server's server.py.
+
+    The MCP server's directory is appended to sys.path, so the backend's
+    own modules win when both have one with the same name.
+    """
+    app_dir = path.abspath(MCP_SERVER_APP_DIR)
+    if app_dir not in sys.path:
+        sys.path.append(app_dir)
+    return importlib.import_module("server")
+
+def load_inprocess_server():
+    """Import the FastMCP instance from the MCP server's server.py."""
+    return load_inprocess_module().mcp
+
+@asynccontextmanager
+async def open_session(transport: str, url: str, message_handler: Optional[Callable] = None):
+    """Open an (uninitialized) MCP client session over the given transport."""
+    if transport == "inprocess":
+        from fastmcp.client.transports import FastMCPTransport
+        async with FastMCPTransport(load_inprocess_server()).connect_session(
+            message_handler=message_handler
+        ) as session:
+            yield session
+        return
+    if transport == "streamable-http":
+        client = streamable_http_client(url)
+    elif transport == "sse":
+        client = sse_client(url)
+    else:
+        raise ValueError(f"Unknown MCP transport {transport!r}")
+    async with client as streams:
+        # streamable HTTP also yields a session-id getter we don't need
+        read, write = streams[0], streams[1]
+        async with ClientSession(read, write, message_handler=message_handler) as session:
+            yield session
+
+class PooledSession:
+    """
+    One MCP client session, owned by its own supervisor task.
+
+    The transport and ClientSession are async context managers that must
+    be exited by the task that entered them, so each session lives in
+    a task that opens them and holds them until the connection drops or it
+    is asked to disconnect. Unless the pool is closing, the task then
+    reconnects with exponential backoff and jitter.
+    """
+    def __init__(
+        self,
+        index: int,
+        url: str,
+        message_handler: Optional[Callable] = None,
+        transport: str = MCP_TRANSPORT
+    ):
+        self.index = index
+        self.url = url
+        self.transport = transport
+        self.message_handler = message_handler
+        self.session: Optional[ClientSession] = None
+        self.healthy = False
+        self.in_flight = 0
+        self.state = "connecting"
+        self.reconnects = 0
+        self._ready = asyncio.Event()
+        self._disconnect = asyncio.Event()
+        self._closing = False
+        self._on_change: Optional[Callable[[], None]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, on_change: Optional[Callable[[], None]] = None):
+        """Start the supervisor task that owns the connection."""
+        self._on_change = on_change
+        self._ready.clear()
+        self._closing = False
+        self._task = asyncio.create_task(self._supervise(), name=f"mcp-session-{self.index}")
+
+    async def wait_ready(self):
+        """Wait until the first connection attempt has succeeded or failed."""
+        await self._ready.wait()
+
+    @property
+    def alive(self) -> bool:
+        """Whether the supervisor task is currently holding an open session."""
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    def _set_state(self, state: str):
+        self.state = state
+        if self._on_change:
+            self._on_change()
+
+    async def _supervise(self):
+        attempt = 0
+        while not self._closing:
+            self._disconnect.clear()
+            connected = await self._connect()
+            self._ready.set()
+            if self._closing:
+                break
+            if connected:
+                attempt = 0
+            delay = min(
+                MCP_RECONNECT_MAX_DELAY_SECONDS,
+                MCP_RECONNECT_BASE_DELAY_SECONDS * 2 ** attempt
+            )
+            # Full jitter keeps a restarted MCP server from being hit by every session at once
+            delay = random.uniform(0, delay)
+            attempt += 1
+            self.reconnects += 1
+            self._set_state("reconnecting")
+            logger.info(f"MCP session {self.index} reconnecting in {delay:.2f}s (attempt {attempt})")
+            try:
+                await asyncio.wait_for(self._disconnect.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+        self._set_state("closed")
+
+    async def _connect(self) -> bool:
+        """Open a session and hold it until it drops; returns whether it ever connected."""
+        connected = False
+        try:
+            async with open_session(self.transport, self.url, self.message_handler) as session:
+                await session.initialize()
+                self.session = session
+                self.healthy = True
+                connected = True
+                logger.info(f"MCP session {self.index} connected over {self.transport} to {self.url}")
+                self._set_state("connected")
+                self._ready.set()
+                await self._disconnect.wait()
+        except Exception as e:
+            logger.error(f"MCP session {self.index} failed: {e}")
+        finally:
+            self.session = None
+            self.healthy = False
+            if not self._closing:
+                self._set_state("disconnected")
+        return connected
+
+    def reconnect(self):
+        """Drop the current connection so the supervisor opens a fresh one."""
+        self._disconnect.set()
+
+    async def close(self):
+        """Stop the supervisor and close the session."""
+        self._closing = True
+        self._disconnect.set()
+        if self._task:
+            try:
+                await self._task
+            except Exception as e:
+                logger.error(f"Error closing MCP session {self.index}: {e}")
+            self._task = None
+
+class MCPSessionPool:
+    """
+    A fixed-size pool of MCP client sessions.
+
+    Callers check a session out for one request and check it back in when
+    done. Checkout picks the healthy session with the fewest requests in
+    flight and waits when every session is at its in-flight limit. A
+    background health check pings every session and takes unresponsive
+    ones out of rotation, failing the requests still in flight on them. Each session reconnects on its own after a drop,
+    and checkouts made while nothing is connected are parked for up to
+    MCP_RECONNECT_PARK_SECONDS instead of failing right away.
+    """
+    def __init__(
+        self,
+        url: str = MCP_SERVER_URL,
+        size: int = MCP_POOL_SIZE,
+        max_in_flight: int = MCP_SESSION_MAX_IN_FLIGHT,
+        transport: str = MCP_TRANSPORT
+    ):
+        self.url = url
+        self.transport = transport
+        self.size = size
+        self.max_in_flight = max_in_flight
+        self.sessions: List[PooledSession] = []
+        self._notification_handlers: List[Callable[[types.ServerNotification], Awaitable[None]]] = []
+        self._condition = asyncio.Condition()
+        self._health_task: Optional[asyncio.Task] = None
+        # Keeps the notify tasks referenced until they finish
+        self._notify_tasks: set[asyncio.Task] = set()
+
+    @property
+    def available(self) -> bool:
+        """Whether at least one session can serve requests."""
+        return any(pooled.alive and pooled.healthy for pooled in self.sessions)
+
+    @property
+    def state(self) -> str:
+        """Overall connection state: connected, degraded, reconnecting or disconnected."""
+        healthy = sum(1 for pooled in self.sessions if pooled.alive and pooled.healthy)
+        if self.sessions and healthy == len(self.sessions):
+            return "connected"
+        if healthy:
+            return "degraded"
+        if any(pooled.state in ("connecting", "reconnecting") for pooled in self.sessions):
+            return "reconnecting"
+        return "disconnected"
+
+    async def wait_available(self, timeout: float = MCP_RECONNECT_PARK_SECONDS) -> bool:
+        """Wait up to `timeout` seconds for a session to (re)connect."""
+        if self.available:
+            return True
+        try:
+            async with asyncio.timeout(timeout):
+                async with self._condition:
+                    await self._condition.wait_for(lambda: self.available)
+        except TimeoutError:
+            pass
+        return self.available
+
+    async def start(self):
+        """Open every session in the pool and start health checking."""
+        logger.info(f"Opening {self.size} MCP sessions over {self.transport} to {self.url}")
+        self.sessions = [
+            PooledSession(index, self.url, message_handler=self._handle_message, transport=self.transport)
+            for index in range(self.size)
+        ]
+        for pooled in self.sessions:
+            pooled.start(on_change=self._session_changed)
+        await asyncio.gather(*(pooled.wait_ready() for pooled in self.sessions))
+        healthy = sum(1 for pooled in self.sessions if pooled.alive)
+        logger.info(f"MCP session pool ready: {healthy}/{self.size} sessions connected")
+        self._health_task = asyncio.create_task(self._health_check_loop(), name="mcp-pool-health")
+
+    async def close(self):
+        """Stop health checking and close every session."""
+        if self._health_task:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+        await asyncio.gather(*(pooled.close() for pooled in self.sessions))
+        logger.info("MCP session pool closed")
+
+    def add_notification_handler(self, handler: Callable[[types.ServerNotification], Awaitable[None]]):
+        """Register a coroutine called with every notification the MCP server sends."""
+        self._notification_handlers.append(handler)
+
+    async def _handle_message(self, message):
+        if not isinstance(message, types.ServerNotification):
+            return
+        for handler in self._notification_handlers:
+            try:
+                await handler(message)
+            except Exception as e:
+                logger.error(f"Error handling MCP notification {message.root.method}: {e}")
+
+    def _session_changed(self):
+        # Wake parked checkouts so they notice sessions coming and going
+        task = asyncio.get_running_loop().create_task(self._notify_all())
+        self._notify_tasks.add(task)
+        task.add_done_callback(self._notify_tasks.discard)
+
+    async def _notify_all(self):
+        async with self._condition:
+            self._condition.notify_all()
+
+    def _pick(self) -> Optional[PooledSession]:
+        candidates = [
+            pooled for pooled in self.sessions
+            if pooled.alive and pooled.healthy and pooled.in_flight < self.max_in_flight
+        ]
+        return min(candidates, key=lambda pooled: pooled.in_flight, default=None)
+
+    @asynccontextmanager
+    async def checkout(self):
+        """Check out the least busy healthy session for the duration of the block."""
+        loop = asyncio.get_running_loop()
+        parked_at = None
+        try:
+            async with asyncio.timeout(MCP_CHECKOUT_TIMEOUT_SECONDS):
+                async with self._condition:
+                    while True:
+                        pooled = self._pick()
+                        if pooled:
+                            break
+                        if self.available:
+                            await self._condition.wait()
+                            continue
+                        # No session connected: park briefly while the supervisors reconnect
+                        if parked_at is None:
+                            parked_at = loop.time()
+                            logger.info("No MCP session connected, parking call during reconnect")
+                        remaining = MCP_RECONNECT_PARK_SECONDS - (loop.time() - parked_at)
+                        if remaining <= 0:
+                            raise MCPUnavailableError("No healthy MCP session available")
+                        try:
+                            await asyncio.wait_for(self._condition.wait(), remaining)
+                        except TimeoutError:
+                            raise MCPUnavailableError("No healthy MCP session available")
+                    pooled.in_flight += 1
+        except TimeoutError:
+            raise MCPUnavailableError("Timed out waiting for a free MCP session")
+        try:
+            yield pooled.session
+        finally:
+            async with self._condition:
+                pooled.in_flight -= 1
+                self._condition.notify()
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]):
+        """
+        Call an MCP tool on a pooled session.
+
+        The trace context goes along in the request's _meta so the MCP
+        server can continue the trace.
+        """
+        with tracer.start_as_current_span(
+            f"tools/call {name}",
+            kind=SpanKind.CLIENT,
+            attributes={"mcp.tool.name": name}
+        ):
+            async with self.checkout() as session:
+                return await session.call_tool(name, arguments=arguments, meta=inject_context() or None)
+
+    async def list_tools(self, cursor: Optional[str] = None):
+        """List the MCP server's tools on a pooled session."""
+        async with self.checkout() as session:
+            return await session.list_tools(params=types.PaginatedRequestParams(cursor=cursor))
+
+    async def list_resources(self):
+        """List the MCP server's resources on a pooled session."""
+        async with self.checkout() as session:
+            return await session.list_resources()
+
+    async def _health_check_loop(self):
+        while True:
+            await asyncio.sleep(MCP_HEALTH_CHECK_INTERVAL_SECONDS)
+            await asyncio.gather(*(self._check(pooled) for pooled in self.sessions))
+
+    async def _check(self, pooled: PooledSession):
+        # Busy sessions are pinged too: a connection that died under a call
+        # would otherwise keep that call, and the session, hanging for good
+        if not pooled.alive:
+            return
+        try:
+            await asyncio.wait_for(pooled.session.send_ping(), MCP_HEALTH_CHECK_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.warning(f"MCP session {pooled.index} failed health check: {e}")
+            # Take it out of rotation and let its supervisor open a fresh connection
+            async with self._condition:
+                pooled.healthy = False
+                self._condition.notify_all()
+            pooled.reconnect()
+
+    def stats(self) -> Dict[str, Any]:
+        """Summarize pool state for the health endpoint."""
+        return {
+            "state": self.state,
+            "transport": self.transport,
+            "size": self.size,
+            "healthy": sum(1 for pooled in self.sessions if pooled.alive and pooled.healthy),
+            "in_flight": sum(pooled.in_flight for pooled in self.sessions),
+            "max_in_flight_per_session": self.max_in_flight,
+            "reconnects": sum(pooled.reconnects for pooled in self.sessions),
+            "sessions": [
+                {"index": pooled.index, "state": pooled.state, "reconnects": pooled.reconnects}
+                for pooled in self.sessions
+            ]
+        }
+
+mcp_pool = MCPSessionPool()
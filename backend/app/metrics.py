@@ -0,0 +1,57 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+# render() serves these on /metrics
+from telemetry import render
+
+# Model calls take seconds, not milliseconds, so the default buckets are too fine
+LLM_CALL_SECONDS = Histogram(
+    "backend_llm_call_seconds",
+    "Latency of one Messages API call, including streaming until the final message",
+    ["mode"],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+)
+
+TOOL_LOOP_ITERATIONS = Histogram(
+    "backend_tool_loop_iterations",
+    "Tool-use rounds the model needed to finish one chat turn",
+    ["endpoint"],
+    buckets=(0, 1, 2, 3, 4, 6, 8, 12, 16)
+)
+
+TOOL_CALL_SECONDS = Histogram(
+    "backend_tool_call_seconds",
+    "Latency of one MCP tool call requested by the model",
+    ["tool"]
+)
+
+TOOL_CALLS = Counter(
+    "backend_tool_calls_total",
+    "MCP tool calls requested by the model, by outcome (ok, error, timeout)",
+    ["tool", "outcome"]
+)
+
+WEBSOCKET_CONNECTIONS = Gauge(
+    "backend_websocket_connections",
+    "Open websocket connections",
+    ["endpoint"]
+)
+
+TURN_TOKENS = Histogram(
+    "backend_turn_tokens",
+    "Tokens used by one chat turn, summed over its model calls",
+    ["kind"],
+    buckets=(100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000, 200000)
+)
+
+def observe_tool_call(tool_name: str, outcome: str, seconds: float):
+    """Record the latency and outcome of one tool call."""
+    TOOL_CALL_SECONDS.labels(tool=tool_name).observe(seconds)
+    TOOL_CALLS.labels(tool=tool_name, outcome=outcome).inc()
+
+def observe_turn(endpoint: str, usage, iterations: int):
+    """Record the tool-loop length and token counts of a finished chat turn."""
+    TOOL_LOOP_ITERATIONS.labels(endpoint=endpoint).observe(iterations)
+    TURN_TOKENS.labels(kind="input").observe(usage.input_tokens)
+    TURN_TOKENS.labels(kind="output").observe(usage.output_tokens)
+    TURN_TOKENS.labels(kind="cache_read").observe(usage.cache_read_input_tokens)
+    TURN_TOKENS.labels(kind="cache_write").observe(usage.cache_creation_input_tokens)
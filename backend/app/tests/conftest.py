@@ -0,0 +1,42 @@
+import sys
+import os
+
+# Add app directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import json
+import httpx
+import pytest
+
+def message(text: str, input_tokens: int = 100, output_tokens: int = 20) -> dict:
+    """A Messages API response body with one text block."""
+    return {
+        "id": "msg_test",
+        "type": "message",
+        "role": "assistant",
+        "model": "test-model",
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens}
+    }
+
+@pytest.fixture
+def anthropic_api(monkeypatch):
+    """
+    Answer Messages API requests locally.
+
+    Requests are recorded in the returned list; each is answered with
+    message("Summary text").
+    """
+    import llm
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, json=message("Summary text"))
+
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+    client = llm.make_client(httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(llm, "anthropic_client", client)
+    return requests
@@ -0,0 +1,99 @@
+import asyncio
+import pytest
+
+from broadcast import ConnectionManager
+
+class FakeWebSocket:
+    """Websocket recording sent messages; sends block while `stalled` is clear."""
+    def __init__(self, fail: bool = False):
+        self.sent: list[str] = []
+        self.fail = fail
+        self.closed = False
+        self.stalled = asyncio.Event()
+        self.stalled.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message: str):
+        if self.fail:
+            raise RuntimeError("Connection reset")
+        await self.stalled.wait()
+        self.sent.append(message)
+
+    async def close(self):
+        self.closed = True
+
+async def settle():
+    """Let the sender tasks run until they block again."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+async def stalled_client(manager: ConnectionManager) -> FakeWebSocket:
+    """A connected client stuck in its first send of "first"."""
+    websocket = FakeWebSocket()
+    websocket.stalled.clear()
+    await manager.connect(websocket)
+    await manager.broadcast("first")
+    await settle()
+    return websocket
+
+@pytest.mark.asyncio
+class TestBroadcast:
+    """Fan-out to websocket clients without one holding up the others"""
+
+    async def test_stalled_client_doesnt_block_others(self):
+        """Broadcasts reach a fast client while a slow one is stuck"""
+        manager = ConnectionManager(queue_size=2)
+        slow = await stalled_client(manager)
+        fast = FakeWebSocket()
+        await manager.connect(fast)
+        for number in range(3):
+            await manager.broadcast(f"message {number}")
+            await settle()
+        assert fast.sent == ["message 0", "message 1", "message 2"]
+        assert slow.sent == []
+        manager.disconnect(slow)
+        manager.disconnect(fast)
+
+    async def test_drop_oldest_keeps_the_newest(self):
+        """With a full queue the oldest buffered message gives way to the new one"""
+        manager = ConnectionManager(queue_size=2, slow_consumer_policy="drop_oldest")
+        websocket = await stalled_client(manager)
+        for number in range(4):
+            await manager.broadcast(f"message {number}")
+        assert manager.stats()["dropped_messages"] == 2
+        websocket.stalled.set()
+        await settle()
+        assert websocket.sent == ["first", "message 2", "message 3"]
+        assert manager.stats()["connections"] == 1
+        manager.disconnect(websocket)
+
+    async def test_disconnect_policy_drops_the_client(self):
+        """With the disconnect policy a client with a full queue is closed and removed"""
+        manager = ConnectionManager(queue_size=2, slow_consumer_policy="disconnect")
+        websocket = await stalled_client(manager)
+        for number in range(3):
+            await manager.broadcast(f"message {number}")
+        await settle()
+        assert websocket.closed
+        stats = manager.stats()
+        assert (stats["connections"], stats["slow_consumer_disconnects"]) == (0, 1)
+
+    async def test_failed_send_removes_the_connection(self):
+        """A client whose send fails is counted dead and gets no more messages"""
+        manager = ConnectionManager()
+        websocket = FakeWebSocket(fail=True)
+        await manager.connect(websocket)
+        await manager.broadcast("message")
+        await settle()
+        stats = manager.stats()
+        assert (stats["connections"], stats["dead_connections"]) == (0, 1)
+
+    async def test_timed_out_send_removes_the_connection(self):
+        """A send that doesn't finish within send_timeout counts as a dead connection"""
+        manager = ConnectionManager(send_timeout=0.05)
+        await stalled_client(manager)
+        await asyncio.sleep(0.1)
+        stats = manager.stats()
+        assert (stats["connections"], stats["dead_connections"]) == (0, 1)
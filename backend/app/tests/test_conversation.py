@@ -0,0 +1,81 @@
+import asyncio
+import pytest
+
+import conversation
+import llm
+from conversation import SUMMARY_PREFIX, compact
+from llm_scheduler import LLMScheduler
+
+def turn(number: int, size: int = 400) -> list[dict]:
+    """One user turn with a tool round trip, about size / CHARS_PER_TOKEN tokens each message."""
+    return [
+        {"role": "user", "content": f"Question {number} " + "x" * size},
+        {"role": "assistant", "content": [{"type": "tool_use", "id": f"tool_{number}", "name": "get_tasks_tool", "input": {}}]},
+        {"role": "user", "content": [{"type": "tool_result", "tool_use_id": f"tool_{number}", "content": "y" * size}]},
+        {"role": "assistant", "content": f"Answer {number}"}
+    ]
+
+@pytest.mark.asyncio
+class TestSummaryCall:
+    """The summary call made by compaction belongs to the chat turn"""
+
+    async def test_summary_is_counted_in_turn_usage(self, anthropic_api):
+        """The summary's tokens are added to the turn's usage"""
+        usage = llm.TurnUsage()
+        messages = turn(1) + turn(2) + turn(3)
+        compacted = await compact(messages, "client-a", usage, budget=300, mode="summarize")
+        assert len(anthropic_api) == 1
+        assert compacted[0] == {"role": "user", "content": f"{SUMMARY_PREFIX} Summary text"}
+        assert (usage.calls, usage.input_tokens, usage.output_tokens) == (1, 100, 20)
+
+    async def test_summary_waits_for_a_scheduler_slot(self, anthropic_api, monkeypatch):
+        """With every LLM slot taken, the summary call queues instead of going out"""
+        scheduler = LLMScheduler(max_concurrency=1)
+        monkeypatch.setattr(conversation, "llm_scheduler", scheduler)
+        async with scheduler.slot("client-b"):
+            summary = asyncio.create_task(
+                compact(turn(1) + turn(2), "client-a", budget=300, mode="summarize")
+            )
+            await asyncio.sleep(0.05)
+            assert anthropic_api == []
+            assert scheduler.stats()["queued"] == 1
+        await summary
+        assert len(anthropic_api) == 1
+        assert scheduler.stats()["granted"] == 2
+
+@pytest.mark.asyncio
+class TestCompaction:
+    """Trimming the history to the token budget by whole turns"""
+
+    async def test_history_within_budget_is_kept(self):
+        """Nothing is removed while the history fits"""
+        messages = turn(1) + turn(2)
+        assert await compact(messages, "client-a", budget=10000) is messages
+
+    async def test_oldest_turns_are_dropped_whole(self):
+        """Dropping removes whole turns, oldest first, down to the budget"""
+        messages = turn(1) + turn(2) + turn(3)
+        compacted = await compact(messages, "client-a", budget=600, mode="drop")
+        assert compacted == turn(2) + turn(3)
+        assert compacted[0]["content"].startswith("Question 2")
+
+    async def test_latest_turn_is_always_kept(self):
+        """The turn in progress stays even when it alone is over budget"""
+        messages = turn(1) + turn(2, size=4000)
+        assert await compact(messages, "client-a", budget=100, mode="drop") == turn(2, size=4000)
+        assert await compact(turn(1, size=4000), "client-a", budget=100, mode="drop") == turn(1, size=4000)
+
+    async def test_older_summary_is_folded_in(self, anthropic_api):
+        """A previous summary is dropped with its turns and passed on to the next summary"""
+        messages = [{"role": "user", "content": f"{SUMMARY_PREFIX} Earlier summary"}] + turn(1) + turn(2)
+        compacted = await compact(messages, "client-a", budget=300, mode="summarize")
+        assert compacted == [{"role": "user", "content": f"{SUMMARY_PREFIX} Summary text"}] + turn(2)
+        assert "Earlier summary" in anthropic_api[0]["messages"][0]["content"][0]["text"]
+
+    async def test_failed_summary_falls_back_to_dropping(self, monkeypatch):
+        """When the summary call fails the old turns are dropped without a summary"""
+        async def summarize(messages, client_id, usage=None):
+            raise RuntimeError("API down")
+        monkeypatch.setattr(conversation, "summarize", summarize)
+        compacted = await compact(turn(1) + turn(2), "client-a", budget=300, mode="summarize")
+        assert compacted == turn(2)
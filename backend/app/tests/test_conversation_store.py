@@ -0,0 +1,74 @@
+import pytest
+from types import SimpleNamespace
+
+import conversation_store
+from conversation_store import MemoryConversationStore
+
+class Clock:
+    """Stands in for time.monotonic, moved forward by hand."""
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # Only the store's clock: the event loop keeps the real one
+    monkeypatch.setattr(conversation_store, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+def conversation(text: str) -> list[dict]:
+    return [{"role": "user", "content": text}]
+
+@pytest.mark.asyncio
+class TestMemoryConversationStore:
+    """LRU and TTL eviction of the in-process conversation store"""
+
+    async def test_put_and_get(self, clock):
+        """A stored conversation comes back as a copy, and unknown sessions as None"""
+        store = MemoryConversationStore()
+        await store.put("a", conversation("Hello"))
+        messages = await store.get("a")
+        assert messages == conversation("Hello")
+        messages.append({"role": "assistant", "content": "Hi"})
+        assert await store.get("a") == conversation("Hello")
+        assert await store.get("unknown") is None
+
+    async def test_least_recently_used_is_evicted(self, clock):
+        """Past max_sessions the conversation used longest ago goes first"""
+        store = MemoryConversationStore(max_sessions=2)
+        await store.put("a", conversation("A"))
+        await store.put("b", conversation("B"))
+        # Reading "a" makes "b" the least recently used
+        await store.get("a")
+        await store.put("c", conversation("C"))
+        assert await store.get("b") is None
+        assert await store.get("a") == conversation("A")
+        assert await store.get("c") == conversation("C")
+
+    async def test_untouched_conversation_expires(self, clock):
+        """A conversation not used for ttl seconds is gone"""
+        store = MemoryConversationStore(ttl=60)
+        await store.put("a", conversation("A"))
+        clock.now += 59
+        assert await store.get("a") == conversation("A")
+        # The read renewed the TTL
+        clock.now += 59
+        assert await store.get("a") == conversation("A")
+        clock.now += 60
+        assert await store.get("a") is None
+        assert len(store._sessions) == 0
+
+    async def test_delete(self, clock):
+        """A deleted conversation is forgotten; deleting an unknown one is fine"""
+        store = MemoryConversationStore()
+        await store.put("a", conversation("A"))
+        await store.delete("a")
+        await store.delete("a")
+        assert await store.get("a") is None
+
+    async def test_memory_store_is_the_default(self):
+        """Without CONVERSATION_STORE=redis conversations stay in process"""
+        assert isinstance(conversation_store.make_store(), MemoryConversationStore)
@@ -0,0 +1,147 @@
+import asyncio
+import httpx
+import pytest
+
+import api
+from llm_scheduler import LLMScheduler, SchedulerBusyError
+
+async def hold(scheduler: LLMScheduler, client_id: str, order: list, release: asyncio.Event, can_reject: bool = True):
+    """Take a slot for client_id, note it in order, and keep it until release is set."""
+    async with scheduler.slot(client_id, can_reject):
+        order.append(client_id)
+        await release.wait()
+
+async def settle():
+    """Let queued tasks run until they block again."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+@pytest.mark.asyncio
+class TestFairness:
+    """Freed slots go to the waiting clients in round-robin order"""
+
+    async def test_slots_alternate_between_clients(self):
+        """A client queueing several calls doesn't get them all before another client"""
+        scheduler = LLMScheduler(max_concurrency=1, max_queued_per_client=3)
+        order = []
+        releases = [asyncio.Event() for _ in range(5)]
+        clients = ["busy", "chatty", "chatty", "chatty", "quiet"]
+        tasks = []
+        for client_id, release in zip(clients, releases):
+            tasks.append(asyncio.create_task(hold(scheduler, client_id, order, release)))
+            await settle()
+        assert scheduler.stats()["queued"] == 4
+        for release in releases:
+            release.set()
+            await settle()
+        await asyncio.gather(*tasks)
+        assert order == ["busy", "chatty", "quiet", "chatty", "chatty"]
+        stats = scheduler.stats()
+        assert (stats["active"], stats["queued"], stats["granted"]) == (0, 0, 5)
+
+    async def test_free_slot_is_taken_right_away(self):
+        """Below max_concurrency a call neither queues nor waits"""
+        scheduler = LLMScheduler(max_concurrency=2)
+        async with scheduler.slot("a"), scheduler.slot("b"):
+            assert scheduler.stats()["active"] == 2
+            assert scheduler.stats()["queued"] == 0
+        assert scheduler.stats()["active"] == 0
+
+@pytest.mark.asyncio
+class TestBusy:
+    """Calls that would queue too deep are turned away"""
+
+    async def test_full_queue_rejects(self):
+        """A call past max_queue_depth raises SchedulerBusyError instead of waiting"""
+        scheduler = LLMScheduler(max_concurrency=1, max_queue_depth=1)
+        release = asyncio.Event()
+        first = asyncio.create_task(hold(scheduler, "a", [], release))
+        second = asyncio.create_task(hold(scheduler, "b", [], release))
+        await settle()
+        with pytest.raises(SchedulerBusyError) as error:
+            async with scheduler.slot("c"):
+                pass
+        assert error.value.retry_after > 0
+        assert scheduler.stats()["rejected"] == 1
+        release.set()
+        await asyncio.gather(first, second)
+
+    async def test_client_queue_limit_rejects(self):
+        """A client past max_queued_per_client is turned away while others still queue"""
+        scheduler = LLMScheduler(max_concurrency=1, max_queued_per_client=1)
+        release = asyncio.Event()
+        tasks = [asyncio.create_task(hold(scheduler, client_id, [], release)) for client_id in ("a", "b")]
+        await settle()
+        with pytest.raises(SchedulerBusyError):
+            async with scheduler.slot("b"):
+                pass
+        tasks.append(asyncio.create_task(hold(scheduler, "c", [], release)))
+        await settle()
+        assert scheduler.stats()["queued"] == 2
+        release.set()
+        await asyncio.gather(*tasks)
+
+    async def test_follow_up_calls_are_never_rejected(self):
+        """can_reject=False queues past the limits, so a started turn can finish"""
+        scheduler = LLMScheduler(max_concurrency=1, max_queue_depth=0)
+        release = asyncio.Event()
+        order = []
+        first = asyncio.create_task(hold(scheduler, "a", order, release))
+        follow_up = asyncio.create_task(hold(scheduler, "a", order, release, can_reject=False))
+        await settle()
+        assert scheduler.stats()["queued"] == 1
+        release.set()
+        await asyncio.gather(first, follow_up)
+        assert order == ["a", "a"]
+        assert scheduler.stats()["rejected"] == 0
+
+    async def test_chat_answers_429(self, monkeypatch):
+        """/api/chat answers 429 with Retry-After when the scheduler is busy"""
+        scheduler = LLMScheduler(max_concurrency=1, max_queue_depth=0)
+        monkeypatch.setattr(api, "llm_scheduler", scheduler)
+        monkeypatch.setattr(api.mcp_pool, "wait_available", lambda: asyncio.sleep(0, True))
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            async with scheduler.slot("other"):
+                response = await client.post("/api/chat", json={"message": "Hello"})
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == str(SchedulerBusyError().retry_after)
+
+@pytest.mark.asyncio
+class TestCancellation:
+    """Cancelled callers give back their place in the queue or their slot"""
+
+    async def test_cancelled_waiter_leaves_the_queue(self):
+        """A caller cancelled while queued is dropped, and the next one gets the slot"""
+        scheduler = LLMScheduler(max_concurrency=1)
+        release = asyncio.Event()
+        order = []
+        first = asyncio.create_task(hold(scheduler, "a", order, release))
+        cancelled = asyncio.create_task(hold(scheduler, "b", order, release))
+        last = asyncio.create_task(hold(scheduler, "c", order, release))
+        await settle()
+        cancelled.cancel()
+        await settle()
+        assert scheduler.stats()["queued"] == 1
+        release.set()
+        await asyncio.gather(first, last)
+        assert cancelled.cancelled()
+        assert order == ["a", "c"]
+        assert (scheduler.stats()["active"], scheduler.stats()["queued"]) == (0, 0)
+
+    async def test_cancelled_after_handover_passes_the_slot_on(self):
+        """A caller cancelled just as it was handed the slot releases it to the next one"""
+        scheduler = LLMScheduler(max_concurrency=1)
+        order = []
+        release = asyncio.Event()
+        cancelled = asyncio.create_task(hold(scheduler, "b", order, release))
+        last = asyncio.create_task(hold(scheduler, "c", order, release))
+        async with scheduler.slot("a"):
+            await settle()
+        # The slot now belongs to "b", which hasn't run yet
+        cancelled.cancel()
+        await settle()
+        assert order == ["c"]
+        release.set()
+        await last
+        assert (scheduler.stats()["active"], scheduler.stats()["queued"]) == (0, 0)
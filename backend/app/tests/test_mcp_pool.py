@@ -0,0 +1,67 @@
+import asyncio
+import pytest
+
+import mcp_pool
+from mcp_pool import MCPSessionPool, PooledSession
+
+class HangingSession:
+    """An MCP session whose connection died: nothing it sends is ever answered."""
+    async def send_ping(self):
+        await asyncio.Event().wait()
+
+def connected_session(index: int, session) -> PooledSession:
+    pooled = PooledSession(index, "http://mcp.test/sse")
+    pooled.session = session
+    pooled.healthy = True
+    # alive needs a running supervisor task
+    pooled._task = asyncio.create_task(asyncio.Event().wait())
+    return pooled
+
+@pytest.mark.asyncio
+class TestHealthCheck:
+    """MCPSessionPool health checks"""
+
+    async def test_busy_dead_session_is_taken_out(self, monkeypatch):
+        """A session with a call in flight is still pinged, and reconnected when it doesn't answer"""
+        monkeypatch.setattr(mcp_pool, "MCP_HEALTH_CHECK_TIMEOUT_SECONDS", 0.05)
+        pool = MCPSessionPool(size=1)
+        pooled = connected_session(0, HangingSession())
+        pooled.in_flight = 1
+        pool.sessions = [pooled]
+        try:
+            await pool._check(pooled)
+            assert not pooled.healthy
+            assert pooled._disconnect.is_set()
+            assert not pool.available
+        finally:
+            pooled._task.cancel()
+
+@pytest.mark.asyncio
+class TestSessionChanges:
+    """Waking parked checkouts when sessions come and go"""
+
+    async def test_notify_task_is_kept_until_done(self):
+        """The task waking waiters stays referenced until it has run"""
+        pool = MCPSessionPool(size=1)
+        pool._session_changed()
+        assert len(pool._notify_tasks) == 1
+        await asyncio.gather(*pool._notify_tasks)
+        await asyncio.sleep(0)
+        assert pool._notify_tasks == set()
+
+    async def test_parked_wait_wakes_on_connect(self):
+        """wait_available returns as soon as a session reports it connected"""
+        pool = MCPSessionPool(size=1)
+        pooled = PooledSession(0, "http://mcp.test/sse")
+        pool.sessions = [pooled]
+        waiter = asyncio.create_task(pool.wait_available(timeout=5))
+        await asyncio.sleep(0.01)
+        pooled._on_change = pool._session_changed
+        pooled.session = HangingSession()
+        pooled.healthy = True
+        pooled._task = asyncio.create_task(asyncio.Event().wait())
+        try:
+            pooled._set_state("connected")
+            assert await asyncio.wait_for(waiter, 1)
+        finally:
+            pooled._task.cancel()
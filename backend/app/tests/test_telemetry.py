@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MCP_SERVER_APP_DIR = os.path.join(APP_DIR, "..", "..", "mcp-server", "app")
+
+class TestTelemetry:
+    """The tracing and metrics setup shared with the MCP server"""
+
+    def test_copies_match(self):
+        """The backend and the MCP server ship the same telemetry.py"""
+        for name in ("telemetry.py", "log_setup.py"):
+            with open(os.path.join(APP_DIR, name)) as backend, open(os.path.join(MCP_SERVER_APP_DIR, name)) as server:
+                assert backend.read() == server.read(), f"{name} differs between backend and MCP server"
+
+    def test_inprocess_server_keeps_the_backend_provider(self, tmp_path):
+        """Loading the MCP server in process doesn't try to install a second tracer provider"""
+        code = (
+            "import tracing, mcp_pool; from opentelemetry import trace; "
+            "provider = trace.get_tracer_provider(); "
+            "mcp_pool.load_inprocess_module(); "
+            "assert trace.get_tracer_provider() is provider; "
+            "print(provider.resource.attributes['service.name'])"
+        )
+        env = {
+            **os.environ,
+            "TRACING_EXPORTER": "file",
+            "TRACING_FILE": str(tmp_path / "traces.jsonl"),
+            "DATABASE_URL": f"sqlite+aiosqlite:///{tmp_path / 'tasks.db'}",
+            "LOG_LEVEL": "WARNING"
+        }
+        env.pop("OTEL_SERVICE_NAME", None)
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=APP_DIR, env=env, capture_output=True, text=True, timeout=120
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == "zeta-backend"
+        assert "Overriding of current TracerProvider" not in result.stderr
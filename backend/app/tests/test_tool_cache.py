@@ -0,0 +1,149 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from mcp import types
+
+import api
+import tool_cache as tool_cache_module
+from tool_cache import ToolResultCache
+from tool_catalog import ToolCatalog
+
+class Clock:
+    """Stands in for time.monotonic, moved forward by hand."""
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+class FakePool:
+    """MCP session pool serving a fixed tool list and counting tool calls."""
+    def __init__(self, tools: list[types.Tool]):
+        self.tools = tools
+        self.calls: list[tuple[str, dict]] = []
+        self.call_started = asyncio.Event()
+        self.finish_call = None
+
+    def add_notification_handler(self, handler):
+        pass
+
+    async def list_tools(self, cursor=None):
+        return types.ListToolsResult(tools=self.tools)
+
+    async def list_resources(self):
+        return types.ListResourcesResult(resources=[])
+
+    async def call_tool(self, name: str, arguments: dict):
+        self.calls.append((name, arguments))
+        self.call_started.set()
+        if self.finish_call is not None:
+            await self.finish_call.wait()
+        return types.CallToolResult(content=[types.TextContent(type="text", text=f"{name} #{len(self.calls)}")])
+
+def tool(name: str, read_only: bool, meta: dict | None = None) -> types.Tool:
+    return types.Tool(
+        name=name, inputSchema={"type": "object"},
+        annotations=types.ToolAnnotations(readOnlyHint=read_only), _meta=meta
+    )
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # Only the cache's clock: the event loop keeps the real one
+    monkeypatch.setattr(tool_cache_module, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+@pytest.fixture
+def pool(monkeypatch):
+    """call_mcp_tool wired to a fake pool, a fresh catalog and an empty cache."""
+    pool = FakePool([
+        tool("get_tasks_tool", read_only=True),
+        tool("get_stats_tool", read_only=True, meta={"cache_ttl_seconds": 0}),
+        tool("create_task_tool", read_only=False)
+    ])
+    monkeypatch.setattr(api, "mcp_pool", pool)
+    monkeypatch.setattr(api, "tool_catalog", ToolCatalog(pool))
+    monkeypatch.setattr(api, "tool_cache", ToolResultCache())
+    monkeypatch.setattr(api, "TOOL_CACHE_ENABLED", True)
+    return pool
+
+def text(result: types.CallToolResult) -> str:
+    return result.content[0].text
+
+@pytest.mark.asyncio
+class TestToolResultCache:
+    """Lookups, expiry and size bound of the cache itself"""
+
+    async def test_arguments_are_keyed_canonically(self, clock):
+        """Argument order doesn't make a different entry"""
+        cache = ToolResultCache()
+        cache.put("get_tasks_tool", {"status": "Done", "limit": 5}, "result", 30, cache.generation)
+        assert cache.get("get_tasks_tool", {"limit": 5, "status": "Done"}) == "result"
+        assert cache.get("get_tasks_tool", {"limit": 6, "status": "Done"}) is None
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    async def test_entries_expire(self, clock):
+        """An entry is served until its TTL passes"""
+        cache = ToolResultCache()
+        cache.put("get_tasks_tool", {}, "result", 30, cache.generation)
+        clock.now += 29
+        assert cache.get("get_tasks_tool", {}) == "result"
+        clock.now += 1
+        assert cache.get("get_tasks_tool", {}) is None
+        assert cache.stats()["entries"] == 0
+
+    async def test_least_recently_used_is_evicted(self, clock):
+        """Past max_entries the entry read longest ago goes first"""
+        cache = ToolResultCache(max_entries=2)
+        cache.put("a", {}, "A", 30, cache.generation)
+        cache.put("b", {}, "B", 30, cache.generation)
+        cache.get("a", {})
+        cache.put("c", {}, "C", 30, cache.generation)
+        assert cache.get("b", {}) is None
+        assert cache.get("a", {}) == "A"
+
+    async def test_put_from_before_an_invalidation_is_ignored(self, clock):
+        """A read that started before a mutating call doesn't store its stale result"""
+        cache = ToolResultCache()
+        generation = cache.generation
+        cache.invalidate()
+        cache.put("get_tasks_tool", {}, "stale", 30, generation)
+        assert cache.get("get_tasks_tool", {}) is None
+
+@pytest.mark.asyncio
+class TestCallMcpTool:
+    """call_mcp_tool serving read-only tools from the cache"""
+
+    async def test_read_only_results_are_reused(self, pool):
+        """A repeated read-only call is served without an MCP round trip"""
+        first = await api.call_mcp_tool("get_tasks_tool", {"status": "Done"})
+        second = await api.call_mcp_tool("get_tasks_tool", {"status": "Done"})
+        assert text(first) == text(second) == "get_tasks_tool #1"
+        assert len(pool.calls) == 1
+
+    async def test_tool_can_turn_caching_off(self, pool):
+        """cache_ttl_seconds of 0 in the tool's meta means every call goes out"""
+        await api.call_mcp_tool("get_stats_tool", {})
+        await api.call_mcp_tool("get_stats_tool", {})
+        assert len(pool.calls) == 2
+
+    async def test_mutating_call_invalidates(self, pool):
+        """After a call of a tool that may change data, reads go to the server again"""
+        await api.call_mcp_tool("get_tasks_tool", {})
+        await api.call_mcp_tool("create_task_tool", {"title": "Buy milk"})
+        result = await api.call_mcp_tool("get_tasks_tool", {})
+        assert text(result) == "get_tasks_tool #3"
+        assert api.tool_cache.invalidations == 1
+
+    async def test_read_in_flight_during_a_write_is_not_cached(self, pool):
+        """A read overlapping a mutating call may be stale, so it isn't stored"""
+        pool.finish_call = asyncio.Event()
+        read = asyncio.create_task(api.call_mcp_tool("get_tasks_tool", {}))
+        await pool.call_started.wait()
+        pool.finish_call.set()
+        # The write completes while the read is still on its way back
+        await api.call_mcp_tool("create_task_tool", {"title": "Buy milk"})
+        await read
+        pool.finish_call = None
+        result = await api.call_mcp_tool("get_tasks_tool", {})
+        assert text(result) == "get_tasks_tool #3"
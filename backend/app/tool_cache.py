@@ -0,0 +1,80 @@
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+from os import getenv
+import json
+import time
+
+import log_setup as log_setup
+
+logger = log_setup.configure_logging()
+
+TOOL_CACHE_ENABLED = getenv("TOOL_CACHE_ENABLED", "true").lower() == "true"
+TOOL_CACHE_MAX_ENTRIES = int(getenv("TOOL_CACHE_MAX_ENTRIES", "1024"))
+# TTL for read-only tools that don't declare their own "cache_ttl_seconds"
+TOOL_CACHE_DEFAULT_TTL_SECONDS = float(getenv("TOOL_CACHE_DEFAULT_TTL_SECONDS", "30"))
+
+class ToolResultCache:
+    """
+    Size-bounded LRU cache of MCP tool results.
+
+    Entries are keyed by tool name and canonical JSON of the arguments, so
+    argument order and whitespace don't matter. Every successful call of a
+    mutating tool clears the cache; the generation counter keeps a read
+    that was in flight during such a call from storing its stale result.
+    """
+    def __init__(self, max_entries: int = TOOL_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.generation = 0
+        self._entries: OrderedDict[tuple[str, str], tuple[float, Any]] = OrderedDict()
+
+    @staticmethod
+    def key(tool_name: str, arguments: Dict[str, Any]) -> tuple[str, str]:
+        return tool_name, json.dumps(arguments or {}, sort_keys=True, separators=(",", ":"), default=str)
+
+    def get(self, tool_name: str, arguments: Dict[str, Any]) -> Optional[Any]:
+        """Return a fresh cached result, counting the hit or miss."""
+        key = self.key(tool_name, arguments)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        if entry is not None:
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, tool_name: str, arguments: Dict[str, Any], result: Any, ttl: float, generation: int):
+        """Cache a result unless a mutating call happened since `generation` was read."""
+        if generation != self.generation:
+            return
+        key = self.key(tool_name, arguments)
+        self._entries[key] = (time.monotonic() + ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self):
+        """Drop every cached read after a mutating tool call."""
+        self.generation += 1
+        self.invalidations += 1
+        if self._entries:
+            logger.debug(f"Invalidating {len(self._entries)} cached tool results")
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the health endpoint."""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": TOOL_CACHE_ENABLED,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "invalidations": self.invalidations
+        }
+
+tool_cache = ToolResultCache()
@@ -0,0 +1,120 @@
+from mcp import types
+from typing import Optional, List, Dict, Any
+from os import getenv
+import asyncio
+import time
+
+import log_setup as log_setup
+from mcp_pool import mcp_pool, MCPSessionPool
+from tool_cache import TOOL_CACHE_DEFAULT_TTL_SECONDS
+
+logger = log_setup.configure_logging()
+
+TOOL_CATALOG_TTL_SECONDS = float(getenv("TOOL_CATALOG_TTL_SECONDS", "300"))
+
+class ToolCatalog:
+    """
+    In-memory copy of the tools and resources the MCP server exposes.
+
+    The catalog is loaded from the MCP server on first use and reused until
+    TOOL_CATALOG_TTL_SECONDS pass or the server sends a tools or resources
+    list-changed notification, so building the LLM tool list and serving
+    the catalog endpoints doesn't cost an MCP round trip.
+    """
+    def __init__(self, pool: MCPSessionPool, ttl: float = TOOL_CATALOG_TTL_SECONDS):
+        self.pool = pool
+        self.ttl = ttl
+        self.tools: List[types.Tool] = []
+        self._tools_by_name: Dict[str, types.Tool] = {}
+        self.resources: List[types.Resource] = []
+        self._anthropic_tools: List[Dict[str, Any]] = []
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+        pool.add_notification_handler(self._handle_notification)
+
+    @property
+    def stale(self) -> bool:
+        return time.monotonic() >= self._expires_at
+
+    def invalidate(self):
+        """Force a reload on next use."""
+        self._expires_at = 0.0
+
+    async def _handle_notification(self, notification: types.ServerNotification):
+        if isinstance(notification.root, (
+            types.ToolListChangedNotification,
+            types.ResourceListChangedNotification
+        )):
+            logger.info(f"MCP server sent {notification.root.method}, invalidating tool catalog")
+            self.invalidate()
+
+    async def refresh(self):
+        """Reload tools and resources from the MCP server."""
+        tools: List[types.Tool] = []
+        cursor: Optional[str] = None
+        while True:
+            result = await self.pool.list_tools(cursor)
+            tools.extend(result.tools)
+            cursor = result.nextCursor
+            if not cursor:
+                break
+        resources = (await self.pool.list_resources()).resources
+
+        self.tools = tools
+        self._tools_by_name = {tool.name: tool for tool in tools}
+        self.resources = resources
+        self._anthropic_tools = [
+            {
+                "name": tool.name,
+                "description": tool.description or "",
+                "input_schema": tool.inputSchema
+            } for tool in tools
+        ]
+        self._expires_at = time.monotonic() + self.ttl
+        logger.info(f"Loaded tool catalog: {len(tools)} tools, {len(resources)} resources")
+
+    async def ensure_fresh(self):
+        """Reload the catalog if it is stale, serving the old copy if the reload fails."""
+        if not self.stale:
+            return
+        async with self._lock:
+            # Another caller may have refreshed while we waited for the lock
+            if not self.stale:
+                return
+            try:
+                await self.refresh()
+            except Exception as e:
+                if not self.tools:
+                    raise
+                logger.warning(f"Failed to refresh tool catalog, serving cached copy: {e}")
+
+    async def anthropic_tools(self) -> List[Dict[str, Any]]:
+        """Tool definitions in the format the Messages API expects."""
+        await self.ensure_fresh()
+        return self._anthropic_tools
+
+    async def has_tool(self, name: str) -> bool:
+        """Whether the MCP server exposes a tool with this name."""
+        await self.ensure_fresh()
+        return name in self._tools_by_name
+
+    async def is_read_only(self, name: str) -> bool:
+        """Whether the tool declares that it doesn't change anything (readOnlyHint)."""
+        await self.ensure_fresh()
+        tool = self._tools_by_name.get(name)
+        return bool(tool and tool.annotations and tool.annotations.readOnlyHint)
+
+    async def cache_ttl(self, name: str) -> Optional[float]:
+        """
+        How long results of this tool may be cached, or None if they may not.
+
+        Only read-only tools are cacheable. A tool can set its own TTL with
+        "cache_ttl_seconds" in its meta; 0 turns caching off for it.
+        """
+        if not await self.is_read_only(name):
+            return None
+        meta = self._tools_by_name[name].meta or {}
+        ttl = float(meta.get("cache_ttl_seconds", TOOL_CACHE_DEFAULT_TTL_SECONDS))
+        return ttl if ttl > 0 else None
+
+tool_catalog = ToolCatalog(mcp_pool)
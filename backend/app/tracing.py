@@ -0,0 +1,13 @@
+from opentelemetry import trace, propagate
+from typing import Dict, Any
+
+from telemetry import setup_tracing
+
+def inject_context() -> Dict[str, Any]:
+    """The current trace context as W3C headers, to send along in MCP request meta."""
+    carrier: Dict[str, Any] = {}
+    propagate.inject(carrier)
+    return carrier
+
+setup_tracing("zeta-backend")
+tracer = trace.get_tracer("zeta-backend")
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Broadcast fan-out to thousands of simulated websocket clients.
+
+Compares the old ConnectionManager.broadcast, which awaited send_text on
+each connection in turn, with the queue-per-connection fan-out in
+backend/app/broadcast.py. Most simulated clients take `--latency` seconds
+per send; `--slow` of them take `--slow-latency` seconds, standing in for
+stalled consumers. The figure of interest is how long the fast clients
+wait for each message.
+
+Usage:
+
+  python benchmarks/bench_broadcast.py --clients 5000 --messages 20
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend", "app"))
+
+from broadcast import ConnectionManager
+
+class FakeWebSocket:
+    """Stands in for a starlette WebSocket, recording delivery delays."""
+    def __init__(self, latency: float, slow: bool):
+        self.latency = latency
+        self.slow = slow
+        self.delays = []
+
+    async def accept(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def send_text(self, message: str):
+        await asyncio.sleep(self.latency)
+        self.delays.append(time.perf_counter() - float(message))
+
+def make_clients(args) -> list:
+    return [
+        FakeWebSocket(args.slow_latency if i < args.slow else args.latency, slow=i < args.slow)
+        for i in range(args.clients)
+    ]
+
+async def run_sequential(args) -> list:
+    """The original broadcast: one send_text after another."""
+    clients = make_clients(args)
+    for _ in range(args.messages):
+        message = str(time.perf_counter())
+        for client in clients:
+            await client.send_text(message)
+        await asyncio.sleep(args.interval)
+    return clients
+
+async def run_fanout(args) -> list:
+    """broadcast.ConnectionManager with per-connection queues."""
+    manager = ConnectionManager(queue_size=args.queue_size, slow_consumer_policy=args.policy)
+    clients = make_clients(args)
+    for client in clients:
+        await manager.connect(client)
+    for _ in range(args.messages):
+        await manager.broadcast(str(time.perf_counter()))
+        await asyncio.sleep(args.interval)
+    # Wait until every connected client got all it was queued, so that no
+    # delivery is cut short by the disconnect below
+    while any(
+        len(client.delays) < args.messages - connection.dropped
+        for client, connection in manager.active_connections.items()
+    ):
+        await asyncio.sleep(0.001)
+    print(f"    manager stats: {manager.stats()}")
+    for client in clients:
+        manager.disconnect(client)
+    return clients
+
+def report(label: str, clients: list, elapsed: float) -> int:
+    fast = [delay for client in clients if not client.slow for delay in client.delays]
+    fast.sort()
+    p = lambda q: fast[min(len(fast) - 1, int(q * len(fast)))] * 1000
+    print(
+        f"  {label:20} {elapsed:7.2f}s  fast-client delivery "
+        f"p50={p(0.5):8.1f}ms p99={p(0.99):8.1f}ms max={fast[-1] * 1000:8.1f}ms "
+        f"({len(fast)} deliveries)"
+    )
+    return len(fast)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--clients", type=int, default=5000)
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.01, help="Seconds between broadcasts")
+    parser.add_argument("--latency", type=float, default=0.0, help="Send time of normal clients (s)")
+    parser.add_argument("--slow", type=int, default=5, help="Number of stalled clients")
+    parser.add_argument("--slow-latency", type=float, default=0.05, help="Send time of stalled clients (s)")
+    parser.add_argument("--queue-size", type=int, default=100)
+    parser.add_argument("--policy", default="drop_oldest", choices=["drop_oldest", "disconnect"])
+    args = parser.parse_args()
+
+    print(
+        f"{args.clients} clients ({args.slow} stalled at {args.slow_latency * 1000:.0f}ms/send), "
+        f"{args.messages} broadcasts"
+    )
+    deliveries = []
+    for label, runner in (("sequential (before)", run_sequential), ("fan-out (after)", run_fanout)):
+        start = time.perf_counter()
+        clients = asyncio.run(runner(args))
+        deliveries.append(report(label, clients, time.perf_counter() - start))
+    if len(set(deliveries)) > 1:
+        # Only the slow-consumer policy may keep messages from fast clients
+        print(f"  fast-client deliveries differ: {deliveries}, raise --queue-size to compare like for like")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Concurrent chat-turn throughput: blocking vs async Anthropic client.
+
+Simulates N chat turns in flight on one event loop, each waiting on a
+Messages API call with a fixed latency. The "before" case calls the sync
+client inside an async handler (what api.py used to do); the "after" case
+awaits the shared async client from llm.py. No network or API key is needed,
+responses come from an httpx mock transport.
+
+Usage:
+
+  python benchmarks/bench_llm_concurrency.py --turns 50 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import anthropic
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend", "app"))
+
+import llm
+
+FAKE_MESSAGE = {
+    "id": "msg_bench",
+    "type": "message",
+    "role": "assistant",
+    "model": llm.ANTHROPIC_MODEL,
+    "content": [{"type": "text", "text": "Done!"}],
+    "stop_reason": "end_turn",
+    "stop_sequence": None,
+    "usage": {"input_tokens": 10, "output_tokens": 2},
+}
+
+def blocking_client(latency: float) -> anthropic.Anthropic:
+    """Sync client whose requests block the calling thread for `latency` seconds."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        time.sleep(latency)
+        return httpx.Response(200, json=FAKE_MESSAGE)
+    return anthropic.Anthropic(
+        api_key="bench",
+        http_client=httpx.Client(transport=httpx.MockTransport(handler))
+    )
+
+def async_client(latency: float) -> anthropic.AsyncAnthropic:
+    """Async client from llm.make_client() whose requests await `latency` seconds."""
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        return httpx.Response(200, json=FAKE_MESSAGE)
+    return llm.make_client(httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+async def run_blocking(turns: int, latency: float) -> float:
+    """Run `turns` concurrent turns that call the sync client from async code."""
+    client = blocking_client(latency)
+
+    async def turn():
+        client.messages.create(
+            model=llm.ANTHROPIC_MODEL,
+            max_tokens=llm.ANTHROPIC_MAX_TOKENS,
+            messages=[{"role": "user", "content": "hi"}]
+        )
+
+    start = time.perf_counter()
+    await asyncio.gather(*(turn() for _ in range(turns)))
+    return time.perf_counter() - start
+
+async def run_async(turns: int, latency: float) -> float:
+    """Run `turns` concurrent turns through llm.create_message()."""
+    llm.anthropic_client = async_client(latency)
+
+    async def turn():
+        await llm.create_message([{"role": "user", "content": "hi"}], tools=[])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(turn() for _ in range(turns)))
+    elapsed = time.perf_counter() - start
+    await llm.close()
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--turns", type=int, default=50, help="Concurrent chat turns")
+    parser.add_argument("--latency", type=float, default=0.2, help="Simulated LLM latency (s)")
+    args = parser.parse_args()
+
+    print(f"{args.turns} concurrent turns, {args.latency:.3f}s simulated LLM latency")
+    for label, runner in (("blocking (before)", run_blocking), ("async (after)", run_async)):
+        elapsed = asyncio.run(runner(args.turns, args.latency))
+        print(f"  {label:18} {elapsed:8.3f}s  {args.turns / elapsed:8.1f} turns/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Per-tool-call latency over each MCP transport.
+
+Calls MCP tools through a one-session MCPSessionPool over SSE, streamable
+HTTP and the in-process transport, against the real MCP server on a
+temporary SQLite database. The SSE and streamable HTTP servers run as
+`fastmcp run` subprocesses; the in-process one is the same FastMCP
+instance imported into this process. Reports p50/p99 latency of
+sequential calls and the throughput of concurrent ones.
+
+Usage:
+
+  python benchmarks/bench_mcp_transport.py --calls 500 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend", "app"))
+
+from sqlalchemy import create_engine
+
+import mcp_pool
+from mcp_pool import MCPSessionPool
+
+TRANSPORTS = {
+    "sse": ("sse", "/sse", 8101),
+    "streamable-http": ("http", "/mcp", 8102),
+    "inprocess": (None, None, None),
+}
+
+def start_server(cli_transport: str, port: int) -> subprocess.Popen:
+    """Start `fastmcp run` and wait until it accepts connections."""
+    process = subprocess.Popen(
+        ["fastmcp", "run", "server.py", "--transport", cli_transport,
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "WARNING"],
+        cwd=mcp_pool.MCP_SERVER_APP_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"fastmcp --transport {cli_transport} did not start on port {port}")
+
+async def bench(transport: str, url: str, tool: str, calls: int, concurrency: int) -> tuple[list, float]:
+    pool = MCPSessionPool(url=url, size=1, max_in_flight=concurrency, transport=transport)
+    await pool.start()
+    try:
+        if not await pool.wait_available(timeout=15):
+            raise RuntimeError(f"MCP server did not come up over {transport}")
+        for _ in range(10):
+            await pool.call_tool(tool, {})
+        latencies = []
+        for _ in range(calls):
+            start = time.perf_counter()
+            await pool.call_tool(tool, {})
+            latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def call():
+            async with semaphore:
+                await pool.call_tool(tool, {})
+
+        await asyncio.gather(*(call() for _ in range(calls)))
+        return sorted(latencies), calls / (time.perf_counter() - start)
+    finally:
+        await pool.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--tools", nargs="+", default=["return_fourty_two", "get_tasks_tool"])
+    parser.add_argument("--transports", nargs="+", default=list(TRANSPORTS), choices=list(TRANSPORTS))
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    # Migrate the schema with a sync engine, as the server's init_db does
+    server = mcp_pool.load_inprocess_server()
+    import database
+    with create_engine(f"sqlite:///{DB_PATH}").begin() as connection:
+        database.upgrade_schema(connection)
+
+    print(f"{args.calls} calls per tool, sequential then {args.concurrency} concurrent, one session")
+    for transport in args.transports:
+        cli_transport, route, port = TRANSPORTS[transport]
+        process = start_server(cli_transport, port) if cli_transport else None
+        url = f"http://127.0.0.1:{port}{route}" if cli_transport else "inprocess"
+        try:
+            for tool in args.tools:
+                latencies, throughput = asyncio.run(bench(transport, url, tool, args.calls, args.concurrency))
+                p50 = latencies[len(latencies) // 2] * 1000
+                p99 = latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))] * 1000
+                print(f"  {transport:16} {tool:18} p50={p50:7.2f}ms p99={p99:7.2f}ms  {throughput:8.1f} calls/s concurrent")
+        finally:
+            if process:
+                process.terminate()
+                process.wait()
+    asyncio.run(database.engine.dispose())
+
+if __name__ == "__main__":
+    main()
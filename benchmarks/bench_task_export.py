@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Task export memory and time to first byte as the table grows.
+
+Fills the tasks table to each size in turn and consumes the MCP server's
+NDJSON export (export_task_chunks, a server-side cursor read in batches)
+next to the same export built by loading every row first. For each it
+reports the time to the first chunk, the total time and the peak Python
+memory allocated while exporting (tracemalloc). Runs on a temporary
+SQLite database unless --database-url points at PostgreSQL.
+
+Usage:
+
+  python benchmarks/bench_task_export.py --sizes 10000 100000 1000000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--batch-size", type=int, default=1000, help="EXPORT_BATCH_SIZE of the streaming export")
+    parser.add_argument("--database-url", help="Defaults to a temporary SQLite database; the table is emptied first")
+    return parser.parse_args()
+
+args = parse_args()
+os.environ["DATABASE_URL"] = args.database_url or f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+os.environ["EXPORT_BATCH_SIZE"] = str(args.batch_size)
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "mcp-server", "app"))
+
+from sqlalchemy import delete, insert, select
+
+from database import Base, Task, engine, async_session_maker
+from server import export_task_chunks
+
+engine.echo = False
+BATCH = 20_000
+
+async def fill(current: int, size: int):
+    """Insert tasks until the table holds `size` rows."""
+    start = datetime(2020, 1, 1)
+    async with engine.begin() as conn:
+        for first in range(current, size, BATCH):
+            rows = [
+                {
+                    "title": f"Task {i}",
+                    "description": f"Exported task number {i}",
+                    "status": ("To Do", "In Progress", "Done")[i % 3],
+                    "created_at": start + timedelta(seconds=i),
+                    "updated_at": start + timedelta(seconds=i)
+                } for i in range(first, min(size, first + BATCH))
+            ]
+            await conn.execute(insert(Task), rows)
+
+async def buffered_chunks():
+    """The export as it would be without a cursor: every row loaded, then written."""
+    async with async_session_maker() as db:
+        result = await db.execute(select(Task).order_by(Task.id))
+        tasks = result.scalars().all()
+        yield ("\n".join(json.dumps(task.to_dict()) for task in tasks) + "\n").encode()
+
+async def measure(chunks) -> tuple[float, float, float]:
+    """Seconds to the first chunk, seconds in total and peak MiB allocated."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    first = None
+    written = 0
+    async for chunk in chunks:
+        if first is None:
+            first = time.perf_counter() - start
+        written += len(chunk)
+    total = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first or total, total, peak / 2**20
+
+async def main():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(delete(Task))
+    print(f"{engine.dialect.name}, streaming batches of {args.batch_size}")
+    print(f"  {'rows':>10}  {'export':>9}  {'first ms':>9}  {'total s':>8}  {'peak MiB':>9}")
+    current = 0
+    for size in sorted(args.sizes):
+        await fill(current, size)
+        current = size
+        for label, chunks in (("streamed", export_task_chunks()), ("buffered", buffered_chunks())):
+            first, total, peak = await measure(chunks)
+            print(f"  {size:>10,}  {label:>9}  {first * 1000:9.1f}  {total:8.2f}  {peak:9.1f}")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
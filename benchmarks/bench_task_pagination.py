@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Task listing latency as the table grows: OFFSET vs keyset pages.
+
+Fills the tasks table to each size in turn and times TaskCRUD.get_tasks
+for the first page and for a page 90% of the way down the listing, once
+with skip (OFFSET) and once with the cursor of the page before it
+(keyset on created_at, id), plus the cost of each total count mode.
+Runs on a temporary SQLite database unless --database-url points at
+PostgreSQL, where "estimated" counts come from the planner.
+
+Usage:
+
+  python benchmarks/bench_task_pagination.py --sizes 10000 100000 1000000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--limit", type=int, default=100, help="Page size")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per query, best is reported")
+    parser.add_argument("--database-url", help="Defaults to a temporary SQLite database; the table is emptied first")
+    return parser.parse_args()
+
+args = parse_args()
+os.environ["DATABASE_URL"] = args.database_url or f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "mcp-server", "app"))
+
+from sqlalchemy import delete, insert
+
+from database import Base, Task, engine, async_session_maker
+from crud import TaskCRUD, encode_cursor
+
+engine.echo = False
+BATCH = 20_000
+
+async def fill(current: int, size: int):
+    """Insert tasks until the table holds `size` rows, one second apart."""
+    start = datetime(2020, 1, 1)
+    async with engine.begin() as conn:
+        for first in range(current, size, BATCH):
+            rows = [
+                {
+                    "title": f"Task {i}",
+                    "status": ("To Do", "In Progress", "Done")[i % 3],
+                    "created_at": start + timedelta(seconds=i),
+                    "updated_at": start + timedelta(seconds=i)
+                } for i in range(first, min(size, first + BATCH))
+            ]
+            await conn.execute(insert(Task), rows)
+
+async def best_of(repeat: int, query) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        async with async_session_maker() as db:
+            start = time.perf_counter()
+            await query(db)
+            best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+async def bench(size: int):
+    depth = int(size * 0.9)
+    async with async_session_maker() as db:
+        # The task right before the deep page gives the cursor a client would hold
+        tasks, _, _ = await TaskCRUD.get_tasks(db, skip=depth - 1, limit=1, count="none")
+        cursor = encode_cursor(tasks[0])
+
+    results = {
+        "first page": await best_of(args.repeat, lambda db: TaskCRUD.get_tasks(db, limit=args.limit, count="none")),
+        "deep skip": await best_of(args.repeat, lambda db: TaskCRUD.get_tasks(db, skip=depth, limit=args.limit, count="none")),
+        "deep cursor": await best_of(args.repeat, lambda db: TaskCRUD.get_tasks(db, cursor=cursor, limit=args.limit, count="none")),
+        "count exact": await best_of(args.repeat, lambda db: TaskCRUD.count_tasks(db, [], "exact")),
+        "count estimated": await best_of(args.repeat, lambda db: TaskCRUD.count_tasks(db, [], "estimated")),
+    }
+    print(f"  {size:>10,}  " + "  ".join(f"{ms:12.2f}" for ms in results.values()))
+
+async def main():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(delete(Task))
+    print(f"{engine.dialect.name}, {args.limit} tasks per page, times in ms (best of {args.repeat})")
+    print(f"  {'rows':>10}  " + "  ".join(f"{label:>12}" for label in (
+        "first page", "deep skip", "deep cursor", "count exact", "count est."
+    )))
+    current = 0
+    for size in sorted(args.sizes):
+        await fill(current, size)
+        current = size
+        if engine.dialect.name == "postgresql":
+            async with engine.begin() as conn:
+                await conn.exec_driver_sql("ANALYZE tasks")
+        await bench(size)
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
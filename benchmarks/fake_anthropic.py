@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Anthropic Messages API, for load tests.
+
+Serves POST /v1/messages with scripted responses after a configurable
+latency, both as plain JSON and as a server-sent event stream when the
+request has "stream": true. Point the backend at it with:
+
+  ANTHROPIC_BASE_URL=http://localhost:8010 ANTHROPIC_API_KEY=fake
+
+Responses follow the "responses" rules of a load script (see
+load_script.json). The first rule whose "match" string appears in the
+turn's user message wins; it lists the rounds of tool calls to request,
+then the final text. A rule without "match" is the default.
+
+Usage:
+
+  python benchmarks/fake_anthropic.py --port 8010 --latency 0.5 --jitter 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import uuid
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+DEFAULT_SCRIPT = os.path.join(os.path.dirname(__file__), "load_script.json")
+
+# Characters per streamed text delta
+STREAM_CHUNK = 16
+
+class ScriptedModel:
+    """Picks the next response of a conversation from the script's rules."""
+    def __init__(self, rules: list, latency: float, jitter: float):
+        self.rules = rules
+        self.latency = latency
+        self.jitter = jitter
+        self.default = next((rule for rule in rules if not rule.get("match")), {"text": "Done!"})
+
+    def rule_for(self, text: str) -> dict:
+        return next(
+            (rule for rule in self.rules if rule.get("match") and rule["match"] in text),
+            self.default
+        )
+
+    @staticmethod
+    def current_turn(messages: list) -> tuple[str, int]:
+        """The user text that started the last turn and how many tool rounds it has had."""
+        rounds = 0
+        for message in reversed(messages):
+            content = message["content"]
+            if message["role"] != "user":
+                continue
+            if isinstance(content, str):
+                return content, rounds
+            if any(block.get("type") == "tool_result" for block in content):
+                rounds += 1
+                continue
+            return " ".join(block.get("text", "") for block in content), rounds
+        return "", rounds
+
+    def respond(self, body: dict) -> dict:
+        """Build the Message object the model would return for this request."""
+        text, rounds = self.current_turn(body["messages"])
+        rule = self.rule_for(text)
+        tool_rounds = rule.get("tool_calls", [])
+        if rounds < len(tool_rounds):
+            content = [
+                {"type": "tool_use", "id": f"toolu_{uuid.uuid4().hex[:24]}", "name": call["name"], "input": call.get("input", {})}
+                for call in tool_rounds[rounds]
+            ]
+            stop_reason = "tool_use"
+        else:
+            content = [{"type": "text", "text": rule.get("text", "Done!")}]
+            stop_reason = "end_turn"
+        input_tokens = len(json.dumps(body["messages"])) // 4
+        return {
+            "id": f"msg_{uuid.uuid4().hex[:24]}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "fake"),
+            "content": content,
+            "stop_reason": stop_reason,
+            "stop_sequence": None,
+            "usage": {"input_tokens": input_tokens, "output_tokens": len(json.dumps(content)) // 4}
+        }
+
+    def sample_latency(self) -> float:
+        return max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+
+def sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def stream_events(model: ScriptedModel, message: dict):
+    """Replay a finished message as Messages API streaming events."""
+    # Half the latency passes before the first event, the rest is spread over the deltas
+    latency = model.sample_latency()
+    await asyncio.sleep(latency / 2)
+    content = message["content"]
+    yield sse("message_start", {"type": "message_start", "message": {**message, "content": [], "stop_reason": None}})
+    for index, block in enumerate(content):
+        if block["type"] == "text":
+            start = {"type": "text", "text": ""}
+            chunks = [block["text"][i:i + STREAM_CHUNK] for i in range(0, len(block["text"]), STREAM_CHUNK)]
+            deltas = [{"type": "text_delta", "text": chunk} for chunk in chunks]
+        else:
+            start = {**block, "input": {}}
+            deltas = [{"type": "input_json_delta", "partial_json": json.dumps(block["input"])}]
+        yield sse("content_block_start", {"type": "content_block_start", "index": index, "content_block": start})
+        for delta in deltas:
+            await asyncio.sleep(latency / 2 / (len(deltas) * len(content)))
+            yield sse("content_block_delta", {"type": "content_block_delta", "index": index, "delta": delta})
+        yield sse("content_block_stop", {"type": "content_block_stop", "index": index})
+    yield sse("message_delta", {
+        "type": "message_delta",
+        "delta": {"stop_reason": message["stop_reason"], "stop_sequence": None},
+        "usage": {"output_tokens": message["usage"]["output_tokens"]}
+    })
+    yield sse("message_stop", {"type": "message_stop"})
+
+def make_app(model: ScriptedModel) -> Starlette:
+    async def messages(request: Request):
+        body = await request.json()
+        message = model.respond(body)
+        if body.get("stream"):
+            return StreamingResponse(stream_events(model, message), media_type="text/event-stream")
+        await asyncio.sleep(model.sample_latency())
+        return JSONResponse(message)
+
+    return Starlette(routes=[Route("/v1/messages", messages, methods=["POST"])])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds per model call")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random +/- seconds added to the latency")
+    parser.add_argument("--script", default=DEFAULT_SCRIPT, help="Load script with the response rules")
+    args = parser.parse_args()
+
+    with open(args.script) as f:
+        rules = json.load(f)["responses"]
+    model = ScriptedModel(rules, args.latency, args.jitter)
+    uvicorn.run(make_app(model), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
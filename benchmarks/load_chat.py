@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Load driver for the chat endpoints.
+
+Opens N concurrent client sessions against a running backend and replays
+the conversations of a load script (see load_script.json), client i
+taking conversation i modulo the number of conversations. Websocket
+sessions reuse pychat.run_turn(); with `--endpoint rest` each client posts
+to /api/chat and carries its session_id instead. At the end it reports
+turns/sec, turn latency percentiles and error rates.
+
+To run without model costs, start the fake Messages API and point the
+backend at it (the MCP server can run on SQLite):
+
+  python benchmarks/fake_anthropic.py --latency 0.5 &
+  ANTHROPIC_BASE_URL=http://localhost:8010 ANTHROPIC_API_KEY=fake uvicorn api:app --port 8004
+
+Usage:
+
+  python benchmarks/load_chat.py --clients 50 --rounds 3
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+import httpx
+import websockets
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pychat
+
+DEFAULT_SCRIPT = os.path.join(os.path.dirname(__file__), "load_script.json")
+
+class Results:
+    """Turn latencies and outcomes collected from every client."""
+    def __init__(self):
+        self.latencies = []
+        self.outcomes = Counter()
+
+    def record(self, outcome: str, latency: float):
+        self.outcomes[outcome] += 1
+        if outcome == "ok":
+            self.latencies.append(latency)
+
+    def percentile(self, q: float) -> float:
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+    def report(self, elapsed: float):
+        total = sum(self.outcomes.values())
+        ok = self.outcomes["ok"]
+        print(f"  {total} turns in {elapsed:.2f}s: {ok / elapsed:.1f} turns/s completed")
+        print(
+            f"  turn latency p50={self.percentile(0.5) * 1000:.0f}ms "
+            f"p95={self.percentile(0.95) * 1000:.0f}ms p99={self.percentile(0.99) * 1000:.0f}ms"
+        )
+        for outcome, count in sorted(self.outcomes.items()):
+            print(f"  {outcome:10} {count:6d}  {100 * count / total:5.1f}%")
+
+async def ws_client(args, conversation: list, results: Results):
+    """Replay a conversation over one websocket session."""
+    try:
+        async with websockets.connect(args.url) as websocket:
+            for _ in range(args.rounds):
+                for message in conversation:
+                    start = time.perf_counter()
+                    try:
+                        frame = await asyncio.wait_for(
+                            pychat.run_turn(websocket, message, stream=args.stream), args.timeout
+                        )
+                        outcome = "ok" if frame["type"] == "response" else frame["type"]
+                    except asyncio.TimeoutError:
+                        outcome = "timeout"
+                    results.record(outcome, time.perf_counter() - start)
+                    if outcome == "timeout":
+                        return
+                    await asyncio.sleep(args.think_time)
+    except (OSError, websockets.exceptions.WebSocketException) as e:
+        results.record("disconnect", 0.0)
+        print(f"  client error: {e!r}", file=sys.stderr)
+
+async def rest_client(args, conversation: list, results: Results, http: httpx.AsyncClient):
+    """Replay a conversation through /api/chat, continuing it by session_id."""
+    for _ in range(args.rounds):
+        session_id = None
+        for message in conversation:
+            start = time.perf_counter()
+            try:
+                response = await http.post(args.url, json={"message": message, "session_id": session_id})
+                if response.status_code == 200:
+                    session_id = response.json()["session_id"]
+                    outcome = "ok"
+                elif response.status_code == 429:
+                    outcome = "busy"
+                else:
+                    outcome = f"http_{response.status_code}"
+            except httpx.TimeoutException:
+                outcome = "timeout"
+            except httpx.HTTPError:
+                outcome = "disconnect"
+            results.record(outcome, time.perf_counter() - start)
+            await asyncio.sleep(args.think_time)
+
+async def run(args, conversations: list) -> Results:
+    results = Results()
+    if args.endpoint == "ws":
+        clients = [ws_client(args, conversations[i % len(conversations)], results) for i in range(args.clients)]
+        await asyncio.gather(*clients)
+    else:
+        limits = httpx.Limits(max_connections=args.clients)
+        async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as http:
+            clients = [
+                rest_client(args, conversations[i % len(conversations)], results, http)
+                for i in range(args.clients)
+            ]
+            await asyncio.gather(*clients)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--endpoint", choices=["ws", "rest"], default="ws")
+    parser.add_argument("--url", help="Defaults to pychat's /ws/chat URI, or /api/chat for rest")
+    parser.add_argument("--clients", type=int, default=10, help="Concurrent sessions")
+    parser.add_argument("--rounds", type=int, default=1, help="Times each client replays its conversation")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Seconds between a client's turns")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds before a turn counts as timed out")
+    parser.add_argument("--no-stream", dest="stream", action="store_false", help="Ask /ws/chat not to stream")
+    parser.add_argument("--script", default=DEFAULT_SCRIPT, help="Load script with the conversations")
+    args = parser.parse_args()
+    if not args.url:
+        args.url = pychat.CHAT_URI if args.endpoint == "ws" else "http://localhost:8004/api/chat"
+
+    with open(args.script) as f:
+        conversations = json.load(f)["conversations"]
+    print(f"{args.clients} {args.endpoint} clients x {args.rounds} rounds against {args.url}")
+    start = time.perf_counter()
+    results = asyncio.run(run(args, conversations))
+    results.report(time.perf_counter() - start)
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,43 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from database import Task
+from sqlalchemy import select, func, insert, or_, text, tuple_, literal, literal_column, table, column
+from database import Task, OPEN_DUE_TASKS
 from schemas import TaskCreate, TaskUpdate
-from typing import Optional, List
+from typing import Optional, List, AsyncIterator
 from datetime import datetime, timezone
+import base64
+import json
+import re
 import log_setup as log_setup
 
 logger = log_setup.configure_logging()
+
+def encode_cursor(task: Task) -> str:
+    """Opaque page token holding the sort key of the last task of a page"""
+    key = json.dumps([task.created_at.isoformat(), task.id])
+    return base64.urlsafe_b64encode(key.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Sort key from a page token made by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, task_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(task_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+# Columns written by TaskCRUD.import_tasks, in the order of its rows
+IMPORT_COLUMNS = ["title", "description", "status", "due_date", "created_at", "updated_at"]
+
+def search_terms(query: str) -> List[str]:
+    """Words of a search query, lowercased and stripped of any search syntax"""
+    return re.findall(r"\w+", query.lower())
+
+def naive_utc(value: datetime) -> datetime:
+    """due_date is stored without a time zone, so compare in naive UTC"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
 class TaskCRUD:
     """CRUD operations for tasks"""
     
@@ -25,40 +56,255 @@ class TaskCRUD:
         await db.refresh(task)
         return task
     
+    @staticmethod
+    async def create_tasks(db: AsyncSession, tasks_data: List[TaskCreate]) -> List[Task]:
+        """Create many tasks in one transaction with a multi-row INSERT ... RETURNING"""
+        logger.info(f"Creating {len(tasks_data)} tasks")
+        if not tasks_data:
+            return []
+        rows = [
+            {
+                "title": task_data.title,
+                "description": task_data.description,
+                "status": task_data.status.value if task_data.status else "To Do",
+                "due_date": naive_utc(task_data.due_date) if task_data.due_date else None
+            } for task_data in tasks_data
+        ]
+        # Rows come back in the order of tasks_data
+        result = await db.scalars(insert(Task).returning(Task, sort_by_parameter_order=True), rows)
+        tasks = list(result.all())
+        await db.commit()
+        return tasks
+
+    @staticmethod
+    async def import_tasks(db: AsyncSession, tasks_data: List[TaskCreate]) -> int:
+        """
+        Insert a batch of tasks in the caller's transaction, without reading them back
+
+        On asyncpg the rows go through COPY (copy_records_to_table, binary
+        format), elsewhere through one executemany INSERT. Returns the
+        number of rows written.
+        """
+        if not tasks_data:
+            return 0
+        now = datetime.now()
+        rows = [
+            (
+                task_data.title,
+                task_data.description,
+                task_data.status.value if task_data.status else "To Do",
+                naive_utc(task_data.due_date) if task_data.due_date else None,
+                now,
+                now
+            ) for task_data in tasks_data
+        ]
+        if db.bind.dialect.driver == "asyncpg":
+            connection = await db.connection()
+            # The asyncpg adapter only opens its transaction on the first
+            # statement, and COPY bypasses it, so run one to stay in it
+            await connection.exec_driver_sql("SELECT 1")
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                Task.__tablename__, records=rows, columns=IMPORT_COLUMNS
+            )
+        else:
+            # A Core insert skips the ORM's per-row bookkeeping
+            connection = await db.connection()
+            await connection.execute(insert(Task.__table__), [dict(zip(IMPORT_COLUMNS, row)) for row in rows])
+        return len(rows)
+
     @staticmethod
     async def get_task(db: AsyncSession, task_id: int) -> Optional[Task]:
         """Get a task by ID"""
         result = await db.execute(select(Task).where(Task.id == task_id))
         return result.scalar_one_or_none()
     
+    @staticmethod
+    def task_filters(
+        status: Optional[str] = None,
+        due_after: Optional[datetime] = None,
+        due_before: Optional[datetime] = None,
+        search: Optional[str] = None
+    ) -> list:
+        """WHERE clauses for the task listing filters"""
+        filters = []
+        if status:
+            filters.append(Task.status == status)
+        if due_after:
+            filters.append(Task.due_date >= naive_utc(due_after))
+        if due_before:
+            filters.append(Task.due_date <= naive_utc(due_before))
+        if search:
+            filters.append(or_(
+                Task.title.icontains(search, autoescape=True),
+                Task.description.icontains(search, autoescape=True)
+            ))
+        return filters
+
     @staticmethod
     async def get_tasks(
         db: AsyncSession, 
         skip: int = 0, 
         limit: int = 100,
-        status: Optional[str] = None
-    ) -> tuple[List[Task], int]:
-        """Get all tasks with optional filtering"""
+        status: Optional[str] = None,
+        due_after: Optional[datetime] = None,
+        due_before: Optional[datetime] = None,
+        search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        count: str = "exact"
+    ) -> tuple[List[Task], Optional[int], Optional[str]]:
+        """
+        Get tasks with optional filtering, newest first
+
+        Pages either by skip, or by the cursor of the previous page, which
+        seeks on the (created_at, id) index and so costs the same at any
+        depth. Returns the tasks, the total (None when count is "none")
+        and the cursor of the next page (None on the last page).
+        """
         logger.debug("Top of get_tasks")
-        query = select(Task)
-        
-        if status:
-            query = query.where(Task.status == status)
+        filters = TaskCRUD.task_filters(status, due_after, due_before, search)
+        query = select(Task).where(*filters)
+        if cursor:
+            created_at, task_id = decode_cursor(cursor)
+            query = query.where(tuple_(Task.created_at, Task.id) < (created_at, task_id))
+        elif skip:
+            query = query.offset(skip)
         
-        # Get total count
-        count_query = select(func.count(Task.id))
-        if status:
-            count_query = count_query.where(Task.status == status)
-        total_result = await db.execute(count_query)
-        total = total_result.scalar()
-        
-        # Get paginated results
-        query = query.offset(skip).limit(limit).order_by(Task.created_at.desc())
+        # One extra row tells whether there is a next page
+        query = query.order_by(Task.created_at.desc(), Task.id.desc()).limit(limit + 1)
         result = await db.execute(query)
-        tasks = result.scalars().all()
+        tasks = list(result.scalars().all())
+        next_cursor = None
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            next_cursor = encode_cursor(tasks[-1])
         
-        return list(tasks), total
+        total = await TaskCRUD.count_tasks(db, filters, count)
+        return tasks, total, next_cursor
+
+    @staticmethod
+    async def get_due_tasks(
+        db: AsyncSession,
+        due_before: Optional[datetime] = None,
+        limit: int = 100
+    ) -> List[Task]:
+        """
+        Get tasks that are not done and have a due date, soonest due first
+
+        Served by the ix_tasks_open_due_date partial index, whose predicate
+        the query repeats word for word.
+        """
+        query = select(Task).where(text(OPEN_DUE_TASKS))
+        if due_before:
+            query = query.where(Task.due_date <= naive_utc(due_before))
+        query = query.order_by(Task.due_date, Task.id).limit(limit)
+        result = await db.execute(query)
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def search_tasks(
+        db: AsyncSession,
+        query: str,
+        limit: int = 10,
+        offset: int = 0
+    ) -> tuple[List[tuple[Task, float]], Optional[int]]:
+        """
+        Find tasks by words in their title or description, best match first
+
+        Any word of the query may match, also as the start of a longer
+        word; tasks matching more and rarer words, and title matches,
+        rank higher. PostgreSQL searches the search_vector GIN index and
+        also finds titles with misspelled words through the trigram
+        index; SQLite searches the tasks_fts FTS5 table. Other databases
+        fall back to substring matching, unranked. Returns (task, rank)
+        pairs and the offset of the next page (None on the last page).
+        """
+        terms = search_terms(query)
+        if not terms:
+            return [], None
+        dialect = db.bind.dialect.name
+        if dialect == "postgresql":
+            # search_vector is generated by the database and not in the model
+            search_vector = literal_column("tasks.search_vector")
+            tsquery = func.to_tsquery("english", " | ".join(f"{term}:*" for term in terms))
+            rank = func.ts_rank_cd(search_vector, tsquery) + func.word_similarity(query, Task.title)
+            statement = select(Task, rank.label("search_rank")).where(or_(
+                search_vector.op("@@")(tsquery),
+                literal(query).op("<%")(Task.title)
+            ))
+        elif dialect == "sqlite":
+            tasks_fts = table("tasks_fts", column("rowid"))
+            # bm25 is lower for better matches; titles weigh ten times descriptions
+            rank = -func.bm25(literal_column("tasks_fts"), 10.0, 1.0)
+            statement = (
+                select(Task, rank.label("search_rank"))
+                .join(tasks_fts, tasks_fts.c.rowid == Task.id)
+                .where(literal_column("tasks_fts").op("MATCH")(" OR ".join(f'"{term}"*' for term in terms)))
+            )
+        else:
+            rank = literal(0.0)
+            statement = select(Task, rank.label("search_rank")).where(or_(*(
+                or_(Task.title.icontains(term, autoescape=True), Task.description.icontains(term, autoescape=True))
+                for term in terms
+            )))
+
+        # One extra row tells whether there is a next page
+        statement = statement.order_by(literal_column("search_rank").desc(), Task.id.desc())
+        statement = statement.offset(offset).limit(limit + 1)
+        result = await db.execute(statement)
+        hits = [(task, float(task_rank)) for task, task_rank in result.all()]
+        next_offset = None
+        if len(hits) > limit:
+            hits = hits[:limit]
+            next_offset = offset + limit
+        return hits, next_offset
+
+    @staticmethod
+    async def count_tasks(db: AsyncSession, filters: list, count: str = "exact") -> Optional[int]:
+        """
+        Count tasks matching the filters
+
+        "exact" runs count(*), "none" skips counting, and "estimated" asks
+        the PostgreSQL planner instead of scanning: table statistics when
+        unfiltered, the EXPLAIN row estimate otherwise. Other databases
+        have no cheap estimate, so they count exactly.
+        """
+        if count == "none":
+            return None
+        if count == "estimated" and db.bind.dialect.name == "postgresql":
+            if not filters:
+                result = await db.execute(
+                    text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'tasks'::regclass")
+                )
+                estimate = result.scalar()
+                # -1 until the table has been vacuumed or analyzed
+                if estimate is not None and estimate >= 0:
+                    return estimate
+            else:
+                query = select(Task.id).where(*filters)
+                sql = query.compile(dialect=db.bind.dialect, compile_kwargs={"literal_binds": True})
+                result = await db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+                plan = result.scalar()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                return int(plan[0]["Plan"]["Plan Rows"])
+        result = await db.execute(select(func.count(Task.id)).where(*filters))
+        return result.scalar()
     
+    @staticmethod
+    async def stream_tasks(db: AsyncSession, filters: list, batch_size: int = 1000) -> AsyncIterator[Task]:
+        """
+        Yield every task matching the filters, in id order
+
+        Rows come through a server-side cursor batch_size at a time, and
+        the session only holds weak references to them, so memory stays
+        flat however many tasks there are.
+        """
+        query = select(Task).where(*filters).order_by(Task.id).execution_options(yield_per=batch_size)
+        result = await db.stream_scalars(query)
+        async for task in result:
+            yield task
+
     @staticmethod
     async def update_task(
         db: AsyncSession, 
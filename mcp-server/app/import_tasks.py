@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Bulk task import script for Task Manager.
+
+Loads tasks from a CSV file (with a header row naming the title,
+description, status and due_date columns) or an NDJSON file (one task
+object per line) in one transaction, using COPY on PostgreSQL, and
+reports the import rate.
+"""
+
+import asyncio
+import sys
+from database import engine, async_session_maker
+from task_import import IMPORT_FORMATS, IMPORT_BATCH_SIZE, import_tasks
+
+async def import_file(path: str, format: str, batch_size: int):
+    """Import the tasks of one file, or of stdin when path is "-"."""
+    # Echoing every batch's parameters would take longer than the import
+    engine.echo = False
+    print(f"Importing tasks from {'stdin' if path == '-' else path} ({format})...")
+    try:
+        if path == "-":
+            source = sys.stdin
+        else:
+            source = open(path, newline="", encoding="utf-8")
+        with source:
+            async with async_session_maker() as db:
+                result = await import_tasks(db, source, format, batch_size=batch_size)
+
+        print(f"✓ Imported {result.imported} tasks in {result.seconds:.2f}s ({result.rows_per_second:,.0f} rows/s)")
+        if result.rejected:
+            print(f"✗ Rejected {result.rejected} tasks:")
+            for error in result.errors:
+                print(f"  - line {error.line}: {error.error}")
+            if result.rejected > len(result.errors):
+                print(f"  ... and {result.rejected - len(result.errors)} more")
+        return True
+    except Exception as e:
+        print(f"✗ Error importing tasks: {e}", file=sys.stderr)
+        return False
+    finally:
+        await engine.dispose()
+
+def main():
+    """Main entry point for the script."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import tasks into the Task Manager database")
+    parser.add_argument("path", help="CSV or NDJSON file to import, or - for stdin")
+    parser.add_argument(
+        "--format",
+        choices=IMPORT_FORMATS,
+        help="Input format (default: csv for .csv files, ndjson otherwise)"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=IMPORT_BATCH_SIZE,
+        help="Tasks validated and written per round trip"
+    )
+    args = parser.parse_args()
+
+    format = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    success = asyncio.run(import_file(args.path, format, args.batch_size))
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
@@ -2,27 +2,24 @@
 """
 Database initialization script for Task Manager.
 
-This script creates the database schema and can be used for initial setup
-or to reset the database.
+This script migrates the database schema to the latest revision (see
+alembic.ini and migrations/) and can be used for initial setup, for
+upgrades, or to reset the database.
 """
 
 import asyncio
 import sys
-from database import Base, engine
+from database import Base, engine, upgrade_schema, downgrade_schema
 
 async def init_database():
-    """Initialize the database by creating all tables."""
+    """Initialize the database by running all pending migrations."""
     print("Initializing database...")
     try:
         async with engine.begin() as conn:
-            # Drop all tables (use with caution!)
-            # await conn.run_sync(Base.metadata.drop_all)
-            
-            # Create all tables
-            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(upgrade_schema)
         
         print("✓ Database initialized successfully!")
-        print("Tables created:")
+        print("Tables:")
         for table in Base.metadata.sorted_tables:
             print(f"  - {table.name}")
         
@@ -30,18 +27,23 @@ async def init_database():
     except Exception as e:
         print(f"✗ Error initializing database: {e}", file=sys.stderr)
         return False
+    finally:
+        await engine.dispose()
 
 async def reset_database():
-    """Reset the database by dropping and recreating all tables."""
+    """Reset the database by migrating all the way down and back up."""
     print("Resetting database (WARNING: This will delete all data!)...")
     try:
         async with engine.begin() as conn:
+            # Stamps a database from before migrations, so it can be downgraded
+            await conn.run_sync(upgrade_schema)
+            
             # Drop all tables
-            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(downgrade_schema)
             print("✓ Dropped all tables")
             
             # Create all tables
-            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(upgrade_schema)
             print("✓ Created all tables")
         
         print("✓ Database reset successfully!")
@@ -49,6 +51,8 @@ async def reset_database():
     except Exception as e:
         print(f"✗ Error resetting database: {e}", file=sys.stderr)
         return False
+    finally:
+        await engine.dispose()
 
 def main():
     """Main entry point for the script."""
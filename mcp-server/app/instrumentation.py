@@ -0,0 +1,66 @@
+from opentelemetry import trace, propagate
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from fastmcp.server.middleware import Middleware, MiddlewareContext, CallNext
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+import log_setup as log_setup
+from telemetry import setup_tracing, TRACING_EXPORTER
+
+logger = log_setup.configure_logging()
+
+setup_tracing("zeta-mcp-server")
+tracer = trace.get_tracer("zeta-mcp-server")
+
+class TracingMiddleware(Middleware):
+    """
+    Wrap every tool call in a server span.
+
+    The span continues the trace whose W3C context the client sent in the
+    request's _meta, so backend and MCP server spans end up in one trace.
+    """
+    async def on_call_tool(self, context: MiddlewareContext, call_next: CallNext):
+        # FastMCP rebuilds the params without _meta, so read it off the request
+        request_context = context.fastmcp_context.request_context if context.fastmcp_context else None
+        meta = request_context.meta if request_context else None
+        carrier = meta.model_dump() if meta else {}
+        with tracer.start_as_current_span(
+            f"tools/call {context.message.name}",
+            context=propagate.extract(carrier),
+            kind=SpanKind.SERVER,
+            attributes={"mcp.tool.name": context.message.name}
+        ):
+            return await call_next(context)
+
+def instrument_engine(engine: AsyncEngine):
+    """Record a client span for every SQL statement the engine executes."""
+    if TRACING_EXPORTER == "none":
+        return
+    sync_engine = engine.sync_engine
+    db_system = sync_engine.dialect.name
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _start_span(conn, cursor, statement, parameters, context, executemany):
+        operation = statement.split(None, 1)[0].upper() if statement else "SQL"
+        context._tracing_span = tracer.start_span(
+            operation,
+            kind=SpanKind.CLIENT,
+            attributes={
+                "db.system": db_system,
+                "db.statement": statement,
+                "db.executemany": executemany
+            }
+        )
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _end_span(conn, cursor, statement, parameters, context, executemany):
+        span = getattr(context, "_tracing_span", None)
+        if span is not None:
+            span.end()
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _fail_span(exception_context):
+        span = getattr(exception_context.execution_context, "_tracing_span", None)
+        if span is not None:
+            span.record_exception(exception_context.original_exception)
+            span.set_status(Status(StatusCode.ERROR))
+            span.end()
@@ -0,0 +1,55 @@
+"""
+Alembic environment for the task database.
+
+database.upgrade_schema() hands over an open connection in
+config.attributes["connection"]; the alembic CLI gets none, so one is
+opened on DATABASE_URL.
+"""
+
+import asyncio
+
+from sqlalchemy import pool
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from alembic import context
+
+from database import Base, DATABASE_URL, include_in_autogenerate
+
+config = context.config
+target_metadata = Base.metadata
+
+def run_migrations_offline() -> None:
+    """Print the migration SQL for DATABASE_URL's dialect instead of running it (alembic --sql)."""
+    context.configure(
+        url=DATABASE_URL,
+        target_metadata=target_metadata,
+        include_name=include_in_autogenerate,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def do_run_migrations(connection: Connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_in_autogenerate
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+async def run_async_migrations() -> None:
+    engine = create_async_engine(DATABASE_URL, poolclass=pool.NullPool)
+    async with engine.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+        await connection.commit()
+    await engine.dispose()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+elif config.attributes.get("connection") is not None:
+    do_run_migrations(config.attributes["connection"])
+else:
+    asyncio.run(run_async_migrations())
@@ -0,0 +1,48 @@
+"""add task query indexes
+
+Indexes for the queries TaskCRUD runs:
+
+- ix_tasks_created_at_id: listings, newest first
+- ix_tasks_status_created_at_id: listings filtered by status
+- ix_tasks_open_due_date: open tasks with a due date, soonest first
+  (get_due_tasks), a partial index that leaves out done and undated tasks
+
+Databases adopted from create_all may have some of them already.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 01:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OPEN_DUE_TASKS = "status <> 'Done' AND due_date IS NOT NULL"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_tasks_created_at_id", "tasks", ["created_at", "id"], if_not_exists=True)
+    op.create_index("ix_tasks_status_created_at_id", "tasks", ["status", "created_at", "id"], if_not_exists=True)
+    op.create_index(
+        "ix_tasks_open_due_date", "tasks", ["due_date", "id"],
+        postgresql_where=sa.text(OPEN_DUE_TASKS),
+        sqlite_where=sa.text(OPEN_DUE_TASKS),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_tasks_open_due_date", table_name="tasks")
+    op.drop_index("ix_tasks_status_created_at_id", table_name="tasks")
+    op.drop_index("ix_tasks_created_at_id", table_name="tasks")
@@ -0,0 +1,84 @@
+"""add task search
+
+Full-text search over task titles and descriptions (TaskCRUD.search_tasks).
+
+- PostgreSQL: a generated tsvector column, title weighted above the
+  description, with a GIN index, and a trigram GIN index on the title
+  (pg_trgm) for misspelled words
+- SQLite: an FTS5 table over the tasks table, kept in step by triggers
+
+Neither is in the models, see database.include_in_autogenerate.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 02:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_context().dialect.name
+    if dialect == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(
+            "ALTER TABLE tasks ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+            ") STORED"
+        )
+        op.create_index("ix_tasks_search_vector", "tasks", ["search_vector"], postgresql_using="gin")
+        op.create_index(
+            "ix_tasks_title_trgm", "tasks", ["title"],
+            postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}
+        )
+    elif dialect == "sqlite":
+        op.execute(
+            "CREATE VIRTUAL TABLE tasks_fts USING fts5("
+            "title, description, content='tasks', content_rowid='id', tokenize='porter unicode61')"
+        )
+        op.execute(
+            "CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks BEGIN "
+            "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); "
+            "END"
+        )
+        op.execute(
+            "CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks BEGIN "
+            "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+            "VALUES ('delete', old.id, old.title, old.description); "
+            "END"
+        )
+        op.execute(
+            "CREATE TRIGGER tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN "
+            "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+            "VALUES ('delete', old.id, old.title, old.description); "
+            "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); "
+            "END"
+        )
+        # Index the tasks already there
+        op.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_context().dialect.name
+    if dialect == "postgresql":
+        op.drop_index("ix_tasks_title_trgm", table_name="tasks")
+        op.drop_index("ix_tasks_search_vector", table_name="tasks")
+        op.drop_column("tasks", "search_vector")
+    elif dialect == "sqlite":
+        op.execute("DROP TRIGGER tasks_fts_update")
+        op.execute("DROP TRIGGER tasks_fts_delete")
+        op.execute("DROP TRIGGER tasks_fts_insert")
+        op.execute("DROP TABLE tasks_fts")
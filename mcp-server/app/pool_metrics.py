@@ -0,0 +1,65 @@
+from contextlib import contextmanager
+from time import perf_counter
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
+
+# render() serves these on /metrics
+from telemetry import render
+
+# A free connection comes back in well under a millisecond, waiting for one
+# can take up to DB_POOL_TIMEOUT_SECONDS
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "mcp_db_pool_checkout_seconds",
+    "Time to get a connection from the pool, including waiting for a free one or opening a new one",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+
+DB_POOL_CHECKOUTS_WAITING = Gauge(
+    "mcp_db_pool_checkouts_waiting",
+    "Checkouts waiting for a connection to come back because every connection is in use"
+)
+
+DB_POOL_TIMEOUTS = Counter(
+    "mcp_db_pool_timeouts_total",
+    "Checkouts that gave up after DB_POOL_TIMEOUT_SECONDS without a free connection"
+)
+
+DB_POOL_CONNECTIONS = Gauge(
+    "mcp_db_pool_connections",
+    "Open pool connections, checked out (in_use) or waiting in the pool (idle)",
+    ["state"]
+)
+
+DB_POOL_MAX_CONNECTIONS = Gauge(
+    "mcp_db_pool_max_connections",
+    "Most connections the pool opens at once (DB_POOL_SIZE plus DB_MAX_OVERFLOW)"
+)
+
+@contextmanager
+def pool_checkout(saturated: bool):
+    """Time one pool checkout, counting it as waiting while it runs if the pool was saturated."""
+    if saturated:
+        DB_POOL_CHECKOUTS_WAITING.inc()
+    start = perf_counter()
+    try:
+        yield
+    except PoolTimeoutError:
+        DB_POOL_TIMEOUTS.inc()
+        raise
+    finally:
+        DB_POOL_CHECKOUT_SECONDS.observe(perf_counter() - start)
+        if saturated:
+            DB_POOL_CHECKOUTS_WAITING.dec()
+
+def instrument_pool(engine: AsyncEngine, max_connections: int):
+    """Report the engine's pool connections on the gauges, read at scrape time."""
+    sync_engine = engine.sync_engine
+    if not isinstance(sync_engine.pool, QueuePool):
+        # SQLite in memory shares one connection, there is nothing to size
+        return
+    # engine.dispose() swaps in a new pool, so look it up on every scrape
+    DB_POOL_CONNECTIONS.labels(state="in_use").set_function(lambda: sync_engine.pool.checkedout())
+    DB_POOL_CONNECTIONS.labels(state="idle").set_function(lambda: sync_engine.pool.checkedin())
+    DB_POOL_MAX_CONNECTIONS.set(max_connections)
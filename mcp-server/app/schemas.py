@@ -57,7 +57,34 @@ class TaskResponse(BaseModel):
 
 class TaskListResponse(BaseModel):
     tasks: list[TaskResponse]
-    total: int
+    total: Optional[int] = Field(None, description="Matching tasks, left out when not counted")
+    next_cursor: Optional[str] = Field(None, description="Pass as cursor to get the next page")
+
+class TaskSearchHit(TaskResponse):
+    rank: float = Field(..., description="Relevance to the query, higher is better")
+
+class TaskSearchResponse(BaseModel):
+    tasks: list[TaskSearchHit]
+    next_offset: Optional[int] = Field(None, description="Pass as offset to get the next page")
+
+class BulkItemError(BaseModel):
+    index: int = Field(..., description="Position of the rejected task in the request")
+    error: str
+
+class BulkCreateResponse(BaseModel):
+    created: list[TaskResponse]
+    errors: list[BulkItemError]
+
+class ImportItemError(BaseModel):
+    line: int = Field(..., description="Line of the rejected task in the input")
+    error: str
+
+class ImportResponse(BaseModel):
+    imported: int
+    rejected: int
+    errors: list[ImportItemError] = Field(..., description="The first rejected tasks, up to IMPORT_MAX_ERRORS")
+    seconds: float
+    rows_per_second: float
 
 class ErrorResponse(BaseModel):
     detail: str
@@ -1,30 +1,53 @@
 from fastmcp import FastMCP
 from contextlib import asynccontextmanager
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from typing import Optional, Annotated, Literal, AsyncIterator
+from datetime import datetime
 import log_setup as log_setup
 import logging
+import io
+import json
 import os
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
 
 # Import database and models
 from database import get_db, init_db, async_session_maker
+from pydantic import ValidationError, Field
 from schemas import (
     TaskCreate, TaskUpdate, TaskResponse, TaskListResponse, 
-    ErrorResponse, TaskStatus
+    ErrorResponse, TaskStatus, BulkItemError, BulkCreateResponse,
+    TaskSearchHit, TaskSearchResponse
 )
 from crud import TaskCRUD
+from task_import import import_tasks, validation_message
+from instrumentation import TracingMiddleware
+import pool_metrics
 
 mcp = FastMCP("Task Manager")
+mcp.add_middleware(TracingMiddleware())
 logger = log_setup.configure_logging()
 
-@mcp.tool
+# Most tasks create_tasks_bulk_tool accepts in one call
+MAX_BULK_TASKS = int(os.getenv("MAX_BULK_TASKS", "10000"))
+# Most tasks get_tasks_tool returns in one page
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "500"))
+# Rows fetched per round trip, and written per chunk, by the task export
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+# Tool annotations tell clients which tools only read (and so may be cached,
+# for "cache_ttl_seconds" when given) and which ones change data.
+@mcp.tool(
+    annotations={"readOnlyHint": True, "idempotentHint": True},
+    meta={"cache_ttl_seconds": 3600}
+)
 def return_fourty_two() -> float:
     """Return the number 42"""
     logger.info("Return fourty two tool invoked")
     logger.debug("Return fourty two tool invoked")
     return 42
 
-@mcp.tool
+@mcp.tool(annotations={"readOnlyHint": False, "destructiveHint": False})
 async def create_task_tool(task: TaskCreate) -> dict:
     """MCP Tool: Create a new task"""
     logger.info("Creating task: MCP tool")
@@ -32,21 +55,175 @@ async def create_task_tool(task: TaskCreate) -> dict:
         task_data = await TaskCRUD.create_task(db, task)
         return task_data.to_dict()
 
-@mcp.tool
-async def get_tasks_tool() -> dict:
-    """MCP Tool: get all tasks from database"""
-    logger.info("Getting all tasks from database with MCP tool")
+@mcp.tool(annotations={"readOnlyHint": False, "destructiveHint": False})
+async def create_tasks_bulk_tool(tasks: list[dict], atomic: bool = False) -> dict:
+    """
+    MCP Tool: Create many tasks at once, in one transaction
+
+    Each item takes the same fields as the task of create_task_tool.
+    Invalid items are listed in "errors" by their position and skipped;
+    with atomic set, no task is created if any item is invalid.
+    """
+    logger.info(f"Creating {len(tasks)} tasks in bulk: MCP tool")
+    if len(tasks) > MAX_BULK_TASKS:
+        raise ValueError(f"Too many tasks in one call: {len(tasks)} > {MAX_BULK_TASKS}")
+    valid: list[TaskCreate] = []
+    errors: list[BulkItemError] = []
+    for index, item in enumerate(tasks):
+        try:
+            valid.append(TaskCreate.model_validate(item))
+        except ValidationError as e:
+            errors.append(BulkItemError(index=index, error=validation_message(e)))
+    if atomic and errors:
+        valid = []
+    async with async_session_maker() as db:
+        created = await TaskCRUD.create_tasks(db, valid)
+    return BulkCreateResponse(
+        created=[TaskResponse.model_validate(task) for task in created],
+        errors=errors
+    ).model_dump(mode="json")
+
+@mcp.tool(annotations={"readOnlyHint": False, "destructiveHint": False})
+async def import_tasks_tool(
+    data: Annotated[str, Field(description="The tasks, as CSV with a header row or as one JSON object per line")],
+    format: Literal["csv", "ndjson"] = "ndjson"
+) -> dict:
+    """
+    MCP Tool: Import many tasks from CSV or NDJSON text
+
+    Takes the fields of create_task_tool (title, description, status,
+    due_date). Invalid tasks are skipped and reported by line number;
+    the rest are written in one transaction, with COPY on PostgreSQL.
+    """
+    logger.info(f"Importing tasks from {format}: MCP tool")
+    async with async_session_maker() as db:
+        result = await import_tasks(db, io.StringIO(data, newline=""), format)
+    return result.model_dump()
+
+@mcp.tool(annotations={"readOnlyHint": True}, meta={"cache_ttl_seconds": 30})
+async def get_tasks_tool(
+    status: Annotated[Optional[TaskStatus], Field(description="Only tasks with this status")] = None,
+    due_after: Annotated[Optional[datetime], Field(description="Only tasks due at or after this time")] = None,
+    due_before: Annotated[Optional[datetime], Field(description="Only tasks due at or before this time")] = None,
+    search: Annotated[Optional[str], Field(description="Only tasks whose title or description contains this text")] = None,
+    limit: Annotated[int, Field(ge=1, le=MAX_PAGE_SIZE, description="Most tasks to return")] = 100,
+    cursor: Annotated[Optional[str], Field(description="next_cursor of the previous page, to get the page after it")] = None,
+    skip: Annotated[int, Field(ge=0, description="Number of matching tasks to skip, when not using cursor")] = 0,
+    count: Annotated[
+        Literal["exact", "estimated", "none"],
+        Field(description="How to compute total: exact count, a fast estimate, or not at all")
+    ] = "exact"
+) -> dict:
+    """
+    MCP Tool: get tasks from database, newest first
+
+    All filters are optional and combine with AND. To page through the
+    results, pass the returned next_cursor back as cursor with the same
+    filters; there are no more pages when next_cursor is missing.
+    """
+    logger.info("Getting tasks from database with MCP tool")
     try:
         async with async_session_maker() as db:
-            tasks, total = await TaskCRUD.get_tasks(db)
+            tasks, total, next_cursor = await TaskCRUD.get_tasks(
+                db,
+                skip=skip,
+                limit=limit,
+                status=status.value if status else None,
+                due_after=due_after,
+                due_before=due_before,
+                search=search,
+                cursor=cursor,
+                count=count
+            )
             task_responses = [TaskResponse(**task.to_dict()) for task in tasks]
-            task_list = TaskListResponse(tasks=task_responses, total=total)
+            task_list = TaskListResponse(tasks=task_responses, total=total, next_cursor=next_cursor)
             logger.debug(f"Retrieved tasks successfully: {task_list.model_dump()}")
             return task_list.model_dump()
     except Exception as e:
         logger.error(f"Error getting tasks: {e}")
         raise Exception(f"Failed to retrieve tasts: {e}")
 
+@mcp.tool(annotations={"readOnlyHint": True}, meta={"cache_ttl_seconds": 30})
+async def search_tasks_tool(
+    query: Annotated[str, Field(min_length=1, description="Words to look for in task titles and descriptions")],
+    limit: Annotated[int, Field(ge=1, le=MAX_PAGE_SIZE, description="Most tasks to return")] = 10,
+    offset: Annotated[int, Field(ge=0, description="next_offset of the previous page, to get the page after it")] = 0
+) -> dict:
+    """
+    MCP Tool: find tasks by words in their title or description, best match first
+
+    Tasks matching any of the words, or words starting with them, are
+    returned with a relevance rank. Use this rather than listing every
+    task to find a particular one.
+    """
+    logger.info("Searching tasks with MCP tool")
+    async with async_session_maker() as db:
+        hits, next_offset = await TaskCRUD.search_tasks(db, query, limit=limit, offset=offset)
+        results = TaskSearchResponse(
+            tasks=[TaskSearchHit(**task.to_dict(), rank=rank) for task, rank in hits],
+            next_offset=next_offset
+        )
+        return results.model_dump()
+
+@mcp.tool(annotations={"readOnlyHint": True}, meta={"cache_ttl_seconds": 30})
+async def get_due_tasks_tool(
+    due_before: Annotated[Optional[datetime], Field(description="Only tasks due at or before this time")] = None,
+    limit: Annotated[int, Field(ge=1, le=MAX_PAGE_SIZE, description="Most tasks to return")] = 100
+) -> dict:
+    """MCP Tool: get tasks that are not done yet and have a due date, soonest due first"""
+    logger.info("Getting due tasks from database with MCP tool")
+    async with async_session_maker() as db:
+        tasks = await TaskCRUD.get_due_tasks(db, due_before=due_before, limit=limit)
+        task_list = TaskListResponse(tasks=[TaskResponse(**task.to_dict()) for task in tasks])
+        return task_list.model_dump()
+
+async def export_task_chunks(
+    status: Optional[str] = None,
+    due_after: Optional[datetime] = None,
+    due_before: Optional[datetime] = None,
+    search: Optional[str] = None
+) -> AsyncIterator[bytes]:
+    """Matching tasks as newline-delimited JSON, EXPORT_BATCH_SIZE lines per chunk"""
+    filters = TaskCRUD.task_filters(status, due_after, due_before, search)
+    async with async_session_maker() as db:
+        lines = []
+        async for task in TaskCRUD.stream_tasks(db, filters, batch_size=EXPORT_BATCH_SIZE):
+            lines.append(json.dumps(task.to_dict()))
+            if len(lines) >= EXPORT_BATCH_SIZE:
+                yield ("\n".join(lines) + "\n").encode()
+                lines = []
+        if lines:
+            yield ("\n".join(lines) + "\n").encode()
+
+# A tool result is a single message, so the export is a plain HTTP route
+# served next to the MCP endpoint (sse and streamable-http transports)
+@mcp.custom_route("/tasks/export", methods=["GET"])
+async def export_tasks(request: Request) -> Response:
+    """
+    Stream all tasks as newline-delimited JSON, in id order
+
+    Takes the filters of get_tasks_tool (status, due_after, due_before,
+    search) as query parameters.
+    """
+    params = request.query_params
+    try:
+        status = TaskStatus(params["status"]).value if "status" in params else None
+        due_after = datetime.fromisoformat(params["due_after"]) if "due_after" in params else None
+        due_before = datetime.fromisoformat(params["due_before"]) if "due_before" in params else None
+    except ValueError as e:
+        return JSONResponse({"error": f"Invalid export filter: {e}"}, status_code=422)
+    logger.info("Exporting tasks")
+    return StreamingResponse(
+        export_task_chunks(status, due_after, due_before, params.get("search")),
+        media_type="application/x-ndjson"
+    )
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def get_metrics(request: Request) -> Response:
+    """Prometheus metrics endpoint."""
+    content, content_type = pool_metrics.render()
+    return Response(content=content, media_type=content_type)
+
 @mcp.resource("config://version")
 def get_version() -> dict:
     """Provides the app's configuration"""
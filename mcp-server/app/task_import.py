@@ -0,0 +1,97 @@
+"""
+Bulk task import from CSV or newline-delimited JSON.
+
+Shared by the import_tasks.py CLI and the import_tasks_tool MCP tool.
+Records are read lazily, validated with the TaskCreate rules and written
+IMPORT_BATCH_SIZE at a time, all in one transaction.
+"""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import ValidationError
+from typing import Iterable, Iterator, Union
+import csv
+import os
+import time
+import log_setup as log_setup
+
+from schemas import TaskCreate, ImportItemError, ImportResponse
+from crud import TaskCRUD
+
+logger = log_setup.configure_logging()
+
+IMPORT_FORMATS = ("csv", "ndjson")
+# Tasks validated and written per round trip
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "5000"))
+# Rejected records listed in the result; the rest are only counted
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "100"))
+
+def validation_message(error: ValidationError) -> str:
+    """One line naming each invalid field of a task"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'task'}: {item['msg']}"
+        for item in error.errors()
+    )
+
+def read_records(lines: Iterable[str], format: str) -> Iterator[tuple[int, Union[str, dict]]]:
+    """
+    (line number, record) for each task of the input
+
+    NDJSON records are left as JSON text for TaskCreate to parse. CSV
+    needs a header row naming the columns; empty cells count as missing.
+    """
+    if format == "ndjson":
+        for number, line in enumerate(lines, 1):
+            if line.strip():
+                yield number, line
+    elif format == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, {name: value for name, value in row.items() if name and value}
+    else:
+        raise ValueError(f"Unknown import format {format!r}, expected one of {IMPORT_FORMATS}")
+
+async def import_tasks(
+    db: AsyncSession,
+    lines: Iterable[str],
+    format: str,
+    batch_size: int = IMPORT_BATCH_SIZE
+) -> ImportResponse:
+    """
+    Import every valid task of the input and commit once at the end
+
+    Invalid records are skipped and reported by line number. A database
+    error rolls back the whole import.
+    """
+    start = time.perf_counter()
+    imported = 0
+    rejected = 0
+    errors: list[ImportItemError] = []
+    batch: list[TaskCreate] = []
+    try:
+        for number, record in read_records(lines, format):
+            try:
+                if isinstance(record, str):
+                    batch.append(TaskCreate.model_validate_json(record))
+                else:
+                    batch.append(TaskCreate.model_validate(record))
+            except ValidationError as e:
+                rejected += 1
+                if len(errors) < IMPORT_MAX_ERRORS:
+                    errors.append(ImportItemError(line=number, error=validation_message(e)))
+            if len(batch) >= batch_size:
+                imported += await TaskCRUD.import_tasks(db, batch)
+                batch = []
+        imported += await TaskCRUD.import_tasks(db, batch)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    seconds = time.perf_counter() - start
+    logger.info(f"Imported {imported} tasks in {seconds:.2f}s, rejected {rejected}")
+    return ImportResponse(
+        imported=imported,
+        rejected=rejected,
+        errors=errors,
+        seconds=round(seconds, 3),
+        rows_per_second=round(imported / seconds, 1) if seconds else 0.0
+    )
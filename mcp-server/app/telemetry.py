@@ -0,0 +1,59 @@
+"""
+Tracing and metrics setup shared by the backend and the MCP server.
+
+Both apps ship this same file, like log_setup.py; the backend's
+tests/test_telemetry.py checks that the two copies match. With
+MCP_TRANSPORT=inprocess both apps run in one process and share the
+backend's copy.
+"""
+
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource, SERVICE_NAME
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from os import getenv
+
+import log_setup as log_setup
+
+logger = log_setup.configure_logging()
+
+# "none" turns tracing off, "otlp" sends spans to an OTLP/HTTP collector
+# (OTEL_EXPORTER_OTLP_ENDPOINT, default http://localhost:4318), and "file"
+# appends them to TRACING_FILE as one JSON object per line
+TRACING_EXPORTER = getenv("TRACING_EXPORTER", "none").lower()
+TRACING_FILE = getenv("TRACING_FILE", "traces.jsonl")
+
+def setup_tracing(service_name: str):
+    """
+    Install a tracer provider exporting to TRACING_EXPORTER, unless it is "none".
+
+    The service is named by OTEL_SERVICE_NAME, or else service_name. A
+    provider can only be installed once per process, so when one already
+    is (the backend's, when it runs the MCP server in process) it is kept.
+    """
+    if TRACING_EXPORTER == "none":
+        return
+    if isinstance(trace.get_tracer_provider(), TracerProvider):
+        logger.debug(f"Tracer provider already installed, {service_name} spans go to it")
+        return
+    if TRACING_EXPORTER == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        exporter = OTLPSpanExporter()
+    elif TRACING_EXPORTER == "file":
+        exporter = ConsoleSpanExporter(
+            out=open(TRACING_FILE, "a"),
+            formatter=lambda span: span.to_json(indent=None) + "\n"
+        )
+    else:
+        logger.error(f"Unknown TRACING_EXPORTER {TRACING_EXPORTER!r}, tracing disabled")
+        return
+    resource = Resource.create({SERVICE_NAME: getenv("OTEL_SERVICE_NAME", service_name)})
+    provider = TracerProvider(resource=resource)
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    logger.info(f"Exporting traces with the {TRACING_EXPORTER} exporter")
+
+def render() -> tuple[bytes, str]:
+    """The current metrics in the Prometheus text format, with its content type."""
+    return generate_latest(), CONTENT_TYPE_LATEST
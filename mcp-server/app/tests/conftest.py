@@ -12,8 +12,12 @@ os.environ["TESTING"] = "true"
 # Add app directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from server import app
-from database import Base, get_db
+from server import mcp
+from database import Base
+
+# server.py serves MCP rather than a FastAPI app (the REST task routes moved
+# to the backend), so requests go to the MCP server's own HTTP app
+app = mcp.http_app()
 
 # Test database URL (using in-memory SQLite for tests)
 # Use StaticPool to share the same in-memory database across connections
@@ -41,19 +45,25 @@ async def setup_test_db():
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     
-    # Override the dependency
-    async def _get_test_db():
-        async with test_session_maker() as session:
-            yield session
-    
-    app.dependency_overrides[get_db] = _get_test_db
-    
     yield
     
     # Clean up
-    app.dependency_overrides.clear()
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
+    # Each test runs on its own event loop, so don't carry connections over
+    await test_engine.dispose()
+
+@pytest_asyncio.fixture
+async def db_session():
+    """A session on the test database."""
+    async with test_session_maker() as session:
+        yield session
+
+@pytest.fixture
+def tool_db(monkeypatch):
+    """Point the MCP tools and routes at the test database."""
+    import server
+    monkeypatch.setattr(server, "async_session_maker", test_session_maker)
 
 @pytest_asyncio.fixture
 async def client():
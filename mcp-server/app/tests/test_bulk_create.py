@@ -0,0 +1,56 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select
+
+from database import Task
+from server import create_tasks_bulk_tool
+
+create_tasks_bulk = create_tasks_bulk_tool.fn
+
+@pytest.mark.asyncio
+class TestCreateTasksBulk:
+    """create_tasks_bulk_tool and TaskCRUD.create_tasks"""
+
+    async def test_invalid_items_are_skipped(self, tool_db, db_session):
+        """Valid items are created in input order, invalid ones listed by index"""
+        result = await create_tasks_bulk([
+            {"title": "First"},
+            {"title": ""},
+            {"title": "Second", "status": "Done"},
+            {"title": "Third", "status": "Someday"},
+            {"title": "Fourth"}
+        ])
+        assert [task["title"] for task in result["created"]] == ["First", "Second", "Fourth"]
+        assert [error["index"] for error in result["errors"]] == [1, 3]
+        assert result["errors"][0]["error"].startswith("title:")
+        ids = [task["id"] for task in result["created"]]
+        assert ids == sorted(ids)
+        titles = (await db_session.scalars(select(Task.title).order_by(Task.id))).all()
+        assert titles == ["First", "Second", "Fourth"]
+
+    async def test_atomic_creates_nothing_on_error(self, tool_db, db_session):
+        """With atomic set, one invalid item keeps every task from being created"""
+        result = await create_tasks_bulk([{"title": "Kept out"}, {"title": ""}], atomic=True)
+        assert result["created"] == []
+        assert [error["index"] for error in result["errors"]] == [1]
+        assert (await db_session.scalars(select(Task))).all() == []
+
+    async def test_atomic_creates_all_when_valid(self, tool_db):
+        """atomic doesn't change anything when every item is valid"""
+        result = await create_tasks_bulk([{"title": "A"}, {"title": "B"}], atomic=True)
+        assert [task["title"] for task in result["created"]] == ["A", "B"]
+        assert result["errors"] == []
+
+    async def test_due_dates_are_stored_in_utc(self, tool_db):
+        """A due date with an offset is converted to naive UTC, not stripped of it"""
+        due = (datetime.now(timezone.utc) + timedelta(days=30)).replace(microsecond=0)
+        local = due.astimezone(timezone(timedelta(hours=2)))
+        result = await create_tasks_bulk([{"title": "Due", "due_date": local.isoformat()}])
+        assert result["created"][0]["due_date"] == due.replace(tzinfo=None).isoformat()
+
+    async def test_too_many_tasks(self, tool_db, monkeypatch):
+        """More than MAX_BULK_TASKS items are refused outright"""
+        import server
+        monkeypatch.setattr(server, "MAX_BULK_TASKS", 2)
+        with pytest.raises(ValueError, match="Too many tasks"):
+            await create_tasks_bulk([{"title": "A"}, {"title": "B"}, {"title": "C"}])
@@ -0,0 +1,67 @@
+import json
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+
+from database import Task
+
+START = datetime(2030, 1, 1)
+
+@pytest_asyncio.fixture
+async def export_db(tool_db, db_session, monkeypatch):
+    """25 tasks, every fifth one done and due, exported 10 lines per chunk."""
+    import server
+    monkeypatch.setattr(server, "EXPORT_BATCH_SIZE", 10)
+    await db_session.execute(insert(Task), [
+        {
+            "title": f"Task {i}",
+            "description": "weekly" if i % 2 else None,
+            "status": "Done" if i % 5 == 0 else "To Do",
+            "due_date": START + timedelta(days=i) if i % 5 == 0 else None
+        } for i in range(25)
+    ])
+    await db_session.commit()
+
+def ndjson(response) -> list[dict]:
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.text.endswith("\n")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+@pytest.mark.asyncio
+class TestTaskExport:
+    """GET /tasks/export on the MCP server"""
+
+    async def test_exports_every_task_in_id_order(self, export_db, client):
+        """One JSON task per line, across chunk boundaries"""
+        response = await client.get("/tasks/export")
+        assert response.status_code == 200
+        tasks = ndjson(response)
+        assert [task["title"] for task in tasks] == [f"Task {i}" for i in range(25)]
+        assert [task["id"] for task in tasks] == sorted(task["id"] for task in tasks)
+        assert set(tasks[0]) == {"id", "title", "description", "status", "due_date", "created_at", "updated_at"}
+
+    async def test_filters(self, export_db, client):
+        """status, due_after, due_before and search narrow the export"""
+        response = await client.get("/tasks/export", params={"status": "Done"})
+        assert [task["title"] for task in ndjson(response)] == [f"Task {i}" for i in (0, 5, 10, 15, 20)]
+        response = await client.get("/tasks/export", params={
+            "due_after": (START + timedelta(days=5)).isoformat(),
+            "due_before": (START + timedelta(days=15)).isoformat()
+        })
+        assert [task["title"] for task in ndjson(response)] == ["Task 5", "Task 10", "Task 15"]
+        response = await client.get("/tasks/export", params={"search": "weekly", "status": "Done"})
+        assert [task["title"] for task in ndjson(response)] == ["Task 5", "Task 15"]
+
+    async def test_no_match_is_empty(self, export_db, client):
+        """An export matching nothing is an empty body"""
+        response = await client.get("/tasks/export", params={"search": "nothing like it"})
+        assert response.status_code == 200
+        assert response.text == ""
+
+    @pytest.mark.parametrize("params", [{"due_after": "next tuesday"}, {"status": "Someday"}])
+    async def test_bad_filter(self, export_db, client, params):
+        """A filter that doesn't parse is a 422 with the reason"""
+        response = await client.get("/tasks/export", params=params)
+        assert response.status_code == 422
+        assert response.json()["error"].startswith("Invalid export filter")
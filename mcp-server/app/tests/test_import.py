@@ -0,0 +1,138 @@
+import io
+import json
+import pytest
+from datetime import datetime
+from sqlalchemy import event, select
+
+import task_import
+from crud import TaskCRUD
+from database import Task
+from server import import_tasks_tool
+from task_import import import_tasks, read_records
+
+def ndjson(*tasks) -> list[str]:
+    return [(task if isinstance(task, str) else json.dumps(task)) + "\n" for task in tasks]
+
+async def stored(db) -> list[Task]:
+    return list((await db.scalars(select(Task).order_by(Task.id))).all())
+
+class TestReadRecords:
+    """Splitting the input into numbered records"""
+
+    def test_ndjson_skips_blank_lines(self):
+        """Blank lines are skipped but still counted"""
+        records = list(read_records(["{\"title\": \"a\"}\n", "\n", "  \n", "{\"title\": \"b\"}\n"], "ndjson"))
+        assert [number for number, _ in records] == [1, 4]
+
+    def test_csv_leaves_out_empty_cells(self):
+        """CSV rows are numbered from the header, and empty cells are missing fields"""
+        lines = io.StringIO("title,description,status\nFirst,,Done\nSecond,Some text,\n", newline="")
+        assert list(read_records(lines, "csv")) == [
+            (2, {"title": "First", "status": "Done"}),
+            (3, {"title": "Second", "description": "Some text"})
+        ]
+
+    def test_unknown_format(self):
+        with pytest.raises(ValueError, match="Unknown import format"):
+            list(read_records([], "xml"))
+
+@pytest.mark.asyncio
+class TestImportTasks:
+    """task_import.import_tasks on the SQLite (executemany) path"""
+
+    async def test_invalid_records_are_reported_by_line(self, db_session):
+        """Valid tasks are imported, invalid ones rejected with their line number"""
+        result = await import_tasks(db_session, ndjson(
+            {"title": "Ok", "status": "In Progress"},
+            {"title": ""},
+            "{not json",
+            "",
+            {"title": "Also ok", "status": "Someday"},
+            {"title": "Last", "due_date": "2031-01-01T00:00:00+02:00"}
+        ), "ndjson")
+        assert result.imported == 2
+        assert result.rejected == 3
+        assert [(error.line, error.error.split(":")[0]) for error in result.errors] == [
+            (2, "title"), (3, "task"), (5, "status")
+        ]
+        tasks = await stored(db_session)
+        assert [(task.title, task.status) for task in tasks] == [("Ok", "In Progress"), ("Last", "To Do")]
+        # Stored in naive UTC
+        assert tasks[1].due_date == datetime(2030, 12, 31, 22, 0)
+
+    async def test_csv(self, db_session):
+        """CSV rows go through the same checks, numbered by line"""
+        data = "title,status,due_date\nWrite report,Done,2031-05-01T09:00:00\n,To Do,\nCall back,,\n"
+        result = await import_tasks(db_session, io.StringIO(data, newline=""), "csv")
+        assert (result.imported, result.rejected) == (2, 1)
+        assert result.errors[0].line == 3
+        tasks = await stored(db_session)
+        assert [(task.title, task.status, task.due_date) for task in tasks] == [
+            ("Write report", "Done", datetime(2031, 5, 1, 9)),
+            ("Call back", "To Do", None)
+        ]
+
+    async def test_batches(self, db_session, monkeypatch):
+        """Tasks are written batch_size at a time with one executemany INSERT each"""
+        batches = []
+        statements = []
+        original = TaskCRUD.import_tasks
+
+        async def counting(db, tasks_data):
+            batches.append(len(tasks_data))
+            return await original(db, tasks_data)
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement.split()[0], executemany))
+
+        monkeypatch.setattr(TaskCRUD, "import_tasks", counting)
+        engine = db_session.bind
+        event.listen(engine.sync_engine, "before_cursor_execute", capture)
+        try:
+            result = await import_tasks(
+                db_session, ndjson(*({"title": f"Task {i}"} for i in range(10))), "ndjson", batch_size=4
+            )
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", capture)
+        assert result.imported == 10
+        assert batches == [4, 4, 2]
+        assert statements == [("INSERT", True)] * 3
+        assert [task.title for task in await stored(db_session)] == [f"Task {i}" for i in range(10)]
+
+    async def test_batch_boundary(self, db_session):
+        """An input that fills its last batch exactly leaves nothing out"""
+        result = await import_tasks(
+            db_session, ndjson(*({"title": f"Task {i}"} for i in range(8))), "ndjson", batch_size=4
+        )
+        assert result.imported == 8
+        assert len(await stored(db_session)) == 8
+
+    async def test_error_list_is_capped(self, db_session, monkeypatch):
+        """Past IMPORT_MAX_ERRORS, rejected records are only counted"""
+        monkeypatch.setattr(task_import, "IMPORT_MAX_ERRORS", 2)
+        result = await import_tasks(db_session, ndjson(*({"title": ""} for _ in range(5))), "ndjson")
+        assert result.rejected == 5
+        assert [error.line for error in result.errors] == [1, 2]
+
+    async def test_database_error_rolls_back(self, db_session, monkeypatch):
+        """A failed batch undoes the batches written before it"""
+        original = TaskCRUD.import_tasks
+        calls = []
+
+        async def failing(db, tasks_data):
+            calls.append(len(tasks_data))
+            if len(calls) == 2:
+                raise RuntimeError("disk full")
+            return await original(db, tasks_data)
+
+        monkeypatch.setattr(TaskCRUD, "import_tasks", failing)
+        with pytest.raises(RuntimeError):
+            await import_tasks(db_session, ndjson(*({"title": f"Task {i}"} for i in range(6))), "ndjson", batch_size=3)
+        assert await stored(db_session) == []
+
+    async def test_tool(self, tool_db, db_session):
+        """import_tasks_tool takes the tasks as text"""
+        result = await import_tasks_tool.fn("title,description\nFrom the tool,Imported\n", format="csv")
+        assert result["imported"] == 1
+        assert result["errors"] == []
+        assert [task.description for task in await stored(db_session)] == ["Imported"]
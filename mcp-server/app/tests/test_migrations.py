@@ -0,0 +1,136 @@
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import event, insert, inspect
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+
+from database import Base, Task, upgrade_schema, downgrade_schema, migration_config, include_in_autogenerate
+from crud import TaskCRUD
+
+@pytest_asyncio.fixture
+async def migrated_engine(tmp_path):
+    """A SQLite database migrated to head and filled with tasks, with statistics."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'tasks.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(upgrade_schema)
+        start = datetime(2026, 1, 1)
+        await conn.execute(insert(Task), [
+            {
+                "title": f"Task {i}",
+                "status": ("To Do", "In Progress", "Done")[i % 3],
+                # One task in ten has a due date
+                "due_date": start + timedelta(days=i) if i % 10 == 0 else None,
+                "created_at": start + timedelta(seconds=i),
+                "updated_at": start + timedelta(seconds=i)
+            } for i in range(5000)
+        ])
+        await conn.exec_driver_sql("ANALYZE")
+    yield engine
+    await engine.dispose()
+
+async def query_plans(engine, run) -> list[str]:
+    """EXPLAIN QUERY PLAN of every statement run(db) sends, as one string each."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with async_sessionmaker(engine, class_=AsyncSession)() as db:
+            await run(db)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    plans = []
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            plans.append(" | ".join(row[3] for row in result))
+    return plans
+
+@pytest.mark.asyncio
+class TestMigrations:
+    """Migrations and the indexes they create for the task queries"""
+
+    async def test_migrations_match_models(self, migrated_engine):
+        """Migrating to head gives the schema the models declare"""
+        async with migrated_engine.connect() as conn:
+            diff = await conn.run_sync(
+                lambda sync_conn: compare_metadata(
+                    MigrationContext.configure(sync_conn, opts={"include_name": include_in_autogenerate}),
+                    Base.metadata
+                )
+            )
+        assert diff == []
+
+    async def test_downgrade_to_base(self, migrated_engine):
+        """Downgrading to base drops the tables again"""
+        async with migrated_engine.begin() as conn:
+            await conn.run_sync(downgrade_schema)
+            tables = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names())
+        assert "tasks" not in tables
+
+    async def test_database_from_create_all_is_stamped(self, tmp_path):
+        """A schema made by create_all is adopted instead of created again"""
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'legacy.db'}")
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+                await conn.execute(insert(Task), [{"title": "Kept"}])
+                await conn.run_sync(upgrade_schema)
+                version = (await conn.exec_driver_sql("SELECT version_num FROM alembic_version")).scalar()
+                count = (await conn.exec_driver_sql("SELECT count(*) FROM tasks")).scalar()
+        finally:
+            await engine.dispose()
+        assert version == ScriptDirectory.from_config(migration_config(None)).get_current_head()
+        assert count == 1
+
+    async def test_listing_uses_created_at_index(self, migrated_engine):
+        """Unfiltered pages read the (created_at, id) index in order"""
+        plans = await query_plans(
+            migrated_engine, lambda db: TaskCRUD.get_tasks(db, limit=20, count="none")
+        )
+        assert plans == ["SCAN tasks USING INDEX ix_tasks_created_at_id"]
+
+    async def test_cursor_page_uses_created_at_index(self, migrated_engine):
+        """Keyset pages seek into the (created_at, id) index"""
+        async with async_sessionmaker(migrated_engine, class_=AsyncSession)() as db:
+            _, _, cursor = await TaskCRUD.get_tasks(db, limit=20, count="none")
+        plans = await query_plans(
+            migrated_engine, lambda db: TaskCRUD.get_tasks(db, limit=20, cursor=cursor, count="none")
+        )
+        assert len(plans) == 1
+        assert "ix_tasks_created_at_id" in plans[0]
+        assert "TEMP B-TREE" not in plans[0]
+
+    async def test_status_listing_uses_status_index(self, migrated_engine):
+        """Status filtered pages search the (status, created_at, id) index without sorting"""
+        plans = await query_plans(
+            migrated_engine, lambda db: TaskCRUD.get_tasks(db, status="Done", limit=20)
+        )
+        page, count = plans
+        assert "ix_tasks_status_created_at_id (status=?)" in page
+        assert "TEMP B-TREE" not in page
+        assert "ix_tasks_status_created_at_id" in count
+
+    async def test_due_tasks_use_partial_index(self, migrated_engine):
+        """Open tasks by due date come from the partial index, already in order"""
+        for due_before in (None, datetime(2026, 6, 1)):
+            plans = await query_plans(
+                migrated_engine, lambda db: TaskCRUD.get_due_tasks(db, due_before=due_before, limit=20)
+            )
+            assert len(plans) == 1
+            assert "USING INDEX ix_tasks_open_due_date" in plans[0]
+            assert "TEMP B-TREE" not in plans[0]
+
+    async def test_due_tasks_skip_done_and_undated(self, migrated_engine):
+        """get_due_tasks returns open tasks with a due date, soonest first"""
+        async with async_sessionmaker(migrated_engine, class_=AsyncSession)() as db:
+            tasks = await TaskCRUD.get_due_tasks(db, limit=1000)
+        assert tasks
+        assert all(task.status != "Done" and task.due_date is not None for task in tasks)
+        assert [task.due_date for task in tasks] == sorted(task.due_date for task in tasks)
@@ -0,0 +1,88 @@
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+
+from database import Task
+from crud import TaskCRUD, encode_cursor, decode_cursor
+
+START = datetime(2026, 1, 1)
+
+@pytest_asyncio.fixture
+async def paged_db(db_session):
+    """95 tasks, created in groups of ten sharing one created_at."""
+    await db_session.execute(insert(Task), [
+        {
+            "title": f"Task {i}",
+            "status": "Done" if i % 3 == 0 else "To Do",
+            "created_at": START + timedelta(minutes=i // 10),
+            "updated_at": START
+        } for i in range(95)
+    ])
+    await db_session.commit()
+    return db_session
+
+async def walk(db, limit: int, **filters) -> list[Task]:
+    """Every task, following next_cursor from the first page to the last."""
+    seen = []
+    cursor = None
+    while True:
+        tasks, _, cursor = await TaskCRUD.get_tasks(db, limit=limit, cursor=cursor, count="none", **filters)
+        assert len(tasks) <= limit
+        seen.extend(tasks)
+        if cursor is None:
+            return seen
+
+def newest_first(tasks: list[Task]) -> list[Task]:
+    return sorted(tasks, key=lambda task: (task.created_at, task.id), reverse=True)
+
+@pytest.mark.asyncio
+class TestKeysetPagination:
+    """Cursor pages of TaskCRUD.get_tasks"""
+
+    async def test_walks_every_task_once(self, paged_db):
+        """Pages cut through groups of equal created_at without skipping or repeating a task"""
+        for limit in (1, 7, 10, 94, 95, 100):
+            tasks = await walk(paged_db, limit)
+            assert len(tasks) == 95
+            assert tasks == newest_first(tasks)
+
+    async def test_last_page_has_no_cursor(self, paged_db):
+        """A page that reaches the end returns no next_cursor"""
+        tasks, _, cursor = await TaskCRUD.get_tasks(paged_db, limit=95, count="none")
+        assert len(tasks) == 95
+        assert cursor is None
+
+    async def test_cursor_with_filters(self, paged_db):
+        """A cursor pages within the same filters"""
+        tasks = await walk(paged_db, 4, status="Done")
+        assert len(tasks) == 32
+        assert all(task.status == "Done" for task in tasks)
+        assert tasks == newest_first(tasks)
+
+    async def test_cursor_and_skip_agree(self, paged_db):
+        """The page after a cursor is the one skip reaches"""
+        first, _, cursor = await TaskCRUD.get_tasks(paged_db, limit=15, count="none")
+        by_cursor, _, _ = await TaskCRUD.get_tasks(paged_db, limit=15, cursor=cursor, count="none")
+        by_skip, _, _ = await TaskCRUD.get_tasks(paged_db, limit=15, skip=15, count="none")
+        assert [task.id for task in by_cursor] == [task.id for task in by_skip]
+
+    async def test_count_modes(self, paged_db):
+        """"none" skips the count; SQLite has no estimate, so "estimated" counts exactly"""
+        _, total, _ = await TaskCRUD.get_tasks(paged_db, limit=5, count="none")
+        assert total is None
+        _, total, _ = await TaskCRUD.get_tasks(paged_db, limit=5, count="estimated")
+        assert total == 95
+        _, total, _ = await TaskCRUD.get_tasks(paged_db, limit=5, status="Done", count="exact")
+        assert total == 32
+
+@pytest.mark.parametrize("cursor", ["WzFd", "not a cursor", "", "WyJ5ZXN0ZXJkYXkiLCAxXQ", "e30"])
+def test_malformed_cursor(cursor):
+    """Tokens that don't hold a (created_at, id) pair are refused with ValueError"""
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+def test_cursor_round_trip():
+    """decode_cursor gives back the sort key encode_cursor packed"""
+    task = Task(id=42, created_at=datetime(2026, 3, 1, 12, 30, 15, 123456))
+    assert decode_cursor(encode_cursor(task)) == (task.created_at, 42)
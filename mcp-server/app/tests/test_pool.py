@@ -0,0 +1,125 @@
+import asyncio
+import contextlib
+import os
+import subprocess
+import sys
+import pytest
+import pytest_asyncio
+from prometheus_client import REGISTRY
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import database
+import pool_metrics
+from database import MeteredPool, engine_options
+
+def sample(name: str, labels: dict | None = None) -> float:
+    return REGISTRY.get_sample_value(name, labels or {}) or 0.0
+
+@pytest_asyncio.fixture
+async def small_pool(tmp_path, monkeypatch):
+    """An engine on a SQLite file with a pool of two connections plus one overflow."""
+    monkeypatch.setattr(database, "DB_POOL_SIZE", 2)
+    monkeypatch.setattr(database, "DB_MAX_OVERFLOW", 1)
+    monkeypatch.setattr(database, "DB_POOL_TIMEOUT_SECONDS", 0.2)
+    url = f"sqlite+aiosqlite:///{tmp_path / 'tasks.db'}"
+    engine = create_async_engine(url, **engine_options(url))
+    pool_metrics.instrument_pool(engine, 3)
+    yield engine
+    await engine.dispose()
+
+class TestEngineOptions:
+    """Engine and pool settings taken from the DB_* environment variables"""
+
+    def test_asyncpg_gets_pool_and_statement_cache(self, monkeypatch):
+        """A PostgreSQL URL gets the sized pool and asyncpg's connect arguments"""
+        monkeypatch.setattr(database, "DB_STATEMENT_CACHE_SIZE", 0)
+        options = engine_options("postgresql+asyncpg://user:pass@db:5432/tasks")
+        assert options["poolclass"] is MeteredPool
+        assert options["pool_size"] == database.DB_POOL_SIZE
+        assert options["max_overflow"] == database.DB_MAX_OVERFLOW
+        assert options["connect_args"] == {
+            "timeout": database.DB_CONNECT_TIMEOUT_SECONDS,
+            "prepared_statement_cache_size": 0,
+            "statement_cache_size": 0
+        }
+        assert options["echo"] is False
+
+    def test_sqlite_in_memory_has_no_pool_to_size(self):
+        """An in-memory SQLite database keeps SQLAlchemy's single shared connection"""
+        options = engine_options("sqlite+aiosqlite:///:memory:")
+        assert "poolclass" not in options
+        assert "connect_args" not in options
+
+@pytest.mark.asyncio
+class TestPoolMetrics:
+    """Checkout wait and in-use gauges of the metered pool"""
+
+    async def test_in_use_follows_checkouts(self, small_pool):
+        """Checked out connections count as in use until they are returned"""
+        checkouts = sample("mcp_db_pool_checkout_seconds_count")
+        async with small_pool.connect(), small_pool.connect():
+            assert sample("mcp_db_pool_connections", {"state": "in_use"}) == 2
+            # Free capacity left, so nothing waited
+            assert sample("mcp_db_pool_checkouts_waiting") == 0
+        assert sample("mcp_db_pool_connections", {"state": "in_use"}) == 0
+        assert sample("mcp_db_pool_connections", {"state": "idle"}) == 2
+        assert sample("mcp_db_pool_checkout_seconds_count") == checkouts + 2
+        assert sample("mcp_db_pool_max_connections") == 3
+
+    async def test_exhausted_pool_times_out(self, small_pool):
+        """A checkout beyond pool size plus overflow waits, then times out and is counted"""
+        timeouts = sample("mcp_db_pool_timeouts_total")
+        seconds = sample("mcp_db_pool_checkout_seconds_sum")
+        async with small_pool.connect(), small_pool.connect(), small_pool.connect():
+            checkout = asyncio.create_task(small_pool.connect().start())
+            await asyncio.sleep(0.05)
+            assert sample("mcp_db_pool_checkouts_waiting") == 1
+            with pytest.raises(exc.TimeoutError):
+                await checkout
+        assert sample("mcp_db_pool_timeouts_total") == timeouts + 1
+        assert sample("mcp_db_pool_checkout_seconds_sum") - seconds >= 0.2
+        assert sample("mcp_db_pool_checkouts_waiting") == 0
+
+    async def test_unlimited_overflow_never_waits(self, tmp_path, monkeypatch):
+        """With DB_MAX_OVERFLOW=-1 the pool opens more connections, so no checkout counts as waiting"""
+        monkeypatch.setattr(database, "DB_POOL_SIZE", 1)
+        monkeypatch.setattr(database, "DB_MAX_OVERFLOW", -1)
+        checkouts = []
+        def pool_checkout(saturated):
+            checkouts.append(saturated)
+            return contextlib.nullcontext()
+        monkeypatch.setattr(pool_metrics, "pool_checkout", pool_checkout)
+        url = f"sqlite+aiosqlite:///{tmp_path / 'tasks.db'}"
+        engine = create_async_engine(url, **engine_options(url))
+        try:
+            async with engine.connect(), engine.connect(), engine.connect():
+                pass
+        finally:
+            await engine.dispose()
+        assert checkouts == [False, False, False]
+
+@pytest.mark.asyncio
+async def test_metrics_route(client):
+    """The MCP server serves the pool metrics in the Prometheus text format"""
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert "mcp_db_pool_checkout_seconds" in response.text
+
+def test_loads_next_to_backend_metrics():
+    """server.py imports when the backend's metrics module is already loaded (MCP_TRANSPORT=inprocess)"""
+    app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    backend_dir = os.path.join(app_dir, "..", "..", "backend", "app")
+    # The backend's modules come first on sys.path, as with mcp_pool.load_inprocess_module
+    code = (
+        "import sys; sys.path.append(sys.argv[1]); "
+        "import metrics; import server; "
+        "assert metrics.__file__.startswith(sys.path[0]); print(server.mcp.name)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code, app_dir],
+        cwd=backend_dir, env={**os.environ, "PYTHONPATH": backend_dir},
+        capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().endswith("Task Manager")
@@ -0,0 +1,95 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, event, insert, update
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+
+from database import Task, upgrade_schema
+from crud import TaskCRUD, search_terms
+
+TASKS = [
+    ("Take the car to the garage", "Oil change and new tires"),
+    ("Buy groceries", "Milk, eggs and bread"),
+    ("Wash the car", None),
+    ("Finish the report", "Quarterly numbers for the car dealership"),
+    ("Call mom", None),
+] + [(f"Errand {i}", "Something to do") for i in range(50)]
+
+@pytest_asyncio.fixture
+async def search_db(tmp_path):
+    """A session on a migrated SQLite database (so with tasks_fts) holding TASKS."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'tasks.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(upgrade_schema)
+        await conn.execute(insert(Task), [
+            {"title": title, "description": description} for title, description in TASKS
+        ])
+    async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as db:
+        yield db
+    await engine.dispose()
+
+async def titles(db, query, **kwargs) -> list[str]:
+    hits, _ = await TaskCRUD.search_tasks(db, query, **kwargs)
+    return [task.title for task, _ in hits]
+
+@pytest.mark.asyncio
+class TestSearchTasks:
+    """Full-text task search on the SQLite FTS5 index"""
+
+    async def test_ranks_title_matches_first(self, search_db):
+        """Title matches outrank description matches, and unrelated tasks are left out"""
+        assert await titles(search_db, "car") == [
+            "Wash the car", "Take the car to the garage", "Finish the report"
+        ]
+
+    async def test_any_word_and_word_prefixes_match(self, search_db):
+        """Queries match on any word, also as a prefix, after stemming"""
+        assert await titles(search_db, "find my car task", limit=1) == ["Wash the car"]
+        assert await titles(search_db, "grocer") == ["Buy groceries"]
+        assert await titles(search_db, "tire") == ["Take the car to the garage"]
+
+    async def test_search_syntax_is_ignored(self, search_db):
+        """Quotes and FTS operators in the query are treated as plain words"""
+        assert await titles(search_db, 'mom" OR NEAR(*') == ["Call mom"]
+        assert await titles(search_db, "?!") == []
+
+    async def test_pages_by_offset(self, search_db):
+        """next_offset walks through every match once"""
+        seen = []
+        offset = 0
+        while offset is not None:
+            hits, offset = await TaskCRUD.search_tasks(search_db, "errand", limit=20, offset=offset)
+            seen.extend(task.id for task, _ in hits)
+        assert len(seen) == len(set(seen)) == 50
+
+    async def test_index_follows_updates_and_deletes(self, search_db):
+        """The triggers keep the FTS table in step with the tasks table"""
+        await search_db.execute(update(Task).where(Task.title == "Call mom").values(title="Call dad"))
+        await search_db.execute(delete(Task).where(Task.title == "Buy groceries"))
+        await search_db.commit()
+        assert await titles(search_db, "mom") == []
+        assert await titles(search_db, "dad") == ["Call dad"]
+        assert await titles(search_db, "groceries") == []
+
+    async def test_search_uses_fts_index(self, search_db):
+        """A search is one query served by the FTS5 index"""
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+
+        engine = search_db.bind
+        event.listen(engine.sync_engine, "before_cursor_execute", capture)
+        try:
+            await TaskCRUD.search_tasks(search_db, "car garage")
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+        assert len(statements) == 1
+        statement, parameters = statements[0]
+        connection = await search_db.connection()
+        plan = await connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        assert any("VIRTUAL TABLE INDEX" in row[3] for row in plan)
+
+def test_search_terms():
+    """Queries are split into lowercase words"""
+    assert search_terms("Find my CAR-task!") == ["find", "my", "car", "task"]
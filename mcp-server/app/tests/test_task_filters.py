@@ -0,0 +1,81 @@
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta, timezone
+from fastmcp import Client
+from fastmcp.exceptions import ToolError
+from sqlalchemy import insert
+
+from database import Task
+from crud import TaskCRUD
+from server import mcp
+
+START = datetime(2030, 1, 1)
+
+TASKS = [
+    {"title": "Pay rent", "status": "To Do", "due_date": START},
+    {"title": "File taxes", "description": "Ask about the 50% deduction", "status": "In Progress",
+     "due_date": START + timedelta(days=10)},
+    {"title": "Renew passport", "status": "Done", "due_date": START + timedelta(days=20)},
+    {"title": "Read a book", "description": "Any book_club pick", "status": "To Do"},
+    {"title": "Fix the 5 percent bug", "status": "Done"},
+]
+
+@pytest_asyncio.fixture
+async def filter_db(db_session):
+    """The test database holding TASKS."""
+    await db_session.execute(insert(Task), TASKS)
+    await db_session.commit()
+    return db_session
+
+async def titles(db, **filters) -> set[str]:
+    tasks, total, _ = await TaskCRUD.get_tasks(db, **filters)
+    assert total == len(tasks)
+    return {task.title for task in tasks}
+
+@pytest.mark.asyncio
+class TestTaskFilters:
+    """Listing filters of TaskCRUD.get_tasks and get_tasks_tool"""
+
+    async def test_status(self, filter_db):
+        """Only tasks with the given status"""
+        assert await titles(filter_db, status="Done") == {"Renew passport", "Fix the 5 percent bug"}
+
+    async def test_due_range(self, filter_db):
+        """due_after and due_before are inclusive and leave out undated tasks"""
+        assert await titles(filter_db, due_after=START + timedelta(days=10)) == {"File taxes", "Renew passport"}
+        assert await titles(filter_db, due_before=START + timedelta(days=10)) == {"Pay rent", "File taxes"}
+        assert await titles(
+            filter_db, due_after=START + timedelta(days=1), due_before=START + timedelta(days=19)
+        ) == {"File taxes"}
+
+    async def test_due_range_with_offset(self, filter_db):
+        """Aware bounds are compared in UTC"""
+        bound = (START + timedelta(days=10)).replace(tzinfo=timezone.utc).astimezone(timezone(timedelta(hours=-5)))
+        assert await titles(filter_db, due_after=bound) == {"File taxes", "Renew passport"}
+
+    async def test_search_title_and_description(self, filter_db):
+        """search matches the title or the description, ignoring case"""
+        assert await titles(filter_db, search="BOOK") == {"Read a book"}
+        assert await titles(filter_db, search="deduction") == {"File taxes"}
+
+    async def test_search_wildcards_are_literal(self, filter_db):
+        """% and _ in the search text match themselves only"""
+        assert await titles(filter_db, search="50%") == {"File taxes"}
+        assert await titles(filter_db, search="%") == {"File taxes"}
+        assert await titles(filter_db, search="book_") == {"Read a book"}
+        assert await titles(filter_db, search="_") == {"Read a book"}
+
+    async def test_filters_combine(self, filter_db):
+        """Filters combine with AND"""
+        assert await titles(filter_db, status="To Do", search="rent") == {"Pay rent"}
+        assert await titles(filter_db, status="Done", due_before=START) == set()
+
+    async def test_tool_filters_and_limit_cap(self, tool_db, filter_db):
+        """get_tasks_tool passes the filters on and refuses a limit above MAX_PAGE_SIZE"""
+        async with Client(mcp) as client:
+            result = await client.call_tool("get_tasks_tool", {"status": "Done", "search": "passport"})
+            assert [task["title"] for task in result.data["tasks"]] == ["Renew passport"]
+            with pytest.raises(ToolError):
+                await client.call_tool("get_tasks_tool", {"limit": 501})
+            with pytest.raises(ToolError):
+                await client.call_tool("get_tasks_tool", {"status": "Someday"})
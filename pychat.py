@@ -1,3 +1,4 @@
+import argparse
 import asyncio
 import websockets
 import json
@@ -12,13 +13,34 @@ console = Console()
 ##
 ## Usage;
 ##
-##   python pychat.py
+##   python pychat.py [--no-stream]
 
-async def chat():
+# Protocol 2 only sends the messages added by each turn, not the whole history
+CHAT_URI = "ws://localhost:8004/ws/chat?protocol=2"
+
+# Frame types that end a turn
+TURN_END_FRAMES = ("response", "busy", "error")
+
+def user_message(message: str, stream: bool) -> str:
+    """The JSON frame that starts a chat turn."""
+    return json.dumps({
+        "role": "user",
+        "message": message,
+        "stream": stream
+    })
+
+async def run_turn(websocket, message: str, stream: bool = True) -> dict:
+    """Send one message and read frames until the turn ends; returns the last frame."""
+    await websocket.send(user_message(message, stream))
+    while True:
+        data = json.loads(await websocket.recv())
+        if data["type"] in TURN_END_FRAMES:
+            return data
+
+async def chat(stream: bool = True):
     """Connect to the WebSocket server and handle sending and receiving messages."""
 
-    uri = "ws://localhost:8004/ws/chat"
-    async with websockets.connect(uri) as websocket:
+    async with websockets.connect(CHAT_URI) as websocket:
         console.print("[bold green]Connected to the chat server![/bold green]")
         console.print(Panel.fit("Type your messages below. Type 'exit' to quit.",
             title="Chat Instructions", border_style="blue"))
@@ -34,16 +56,32 @@ async def chat():
                     console.print("[yellow]Bye![/yellow]")
                     await websocket.close()
                     break
-                await websocket.send(json.dumps({"role": "user", "message": user_input}))
+                await websocket.send(user_message(user_input, stream))
 
         async def receive_messages():
             """Receive messages from websocket and print them."""
+            # True while assistant text deltas are being printed on the current line
+            in_text = False
+            # True once any text of the current turn was rendered from deltas
+            turn_streamed = False
             try:
                 while True:
                     response = await websocket.recv()
                     try:
                         data = json.loads(response)
-                        if data["type"] == "tool_use":
+                        if data["type"] != "text_delta" and in_text:
+                            console.print()
+                            in_text = False
+                        if data["type"] == "text_delta":
+                            if not in_text:
+                                console.print()
+                                console.print("[bold green]Assistant:[/bold green] ", end="")
+                                in_text = True
+                            turn_streamed = True
+                            console.print(data["text"], end="", markup=False, highlight=False)
+                        elif data["type"] == "tool_use_start":
+                            console.print(f"[dim]Calling {data['tool_name']}...[/dim]")
+                        elif data["type"] == "tool_use":
                             console.print()
                             console.print(Panel.fit(
                                 f"Tool Used: {data['tool_name']}\nInput: {json.dumps(data['tool_input'], indent=2)}",
@@ -58,11 +96,21 @@ async def chat():
                                 border_style="blue"
                             ))
                         elif data["type"] == 'response':
+                            # Streamed turns have already been printed delta by delta
+                            if not turn_streamed:
+                                console.print()
+                                console.print(Panel.fit(
+                                    f"{data['message']}", 
+                                    title="Assistant", 
+                                    border_style="green"
+                                ))
+                            turn_streamed = False
+                        elif data["type"] == 'busy':
                             console.print()
                             console.print(Panel.fit(
-                                f"{data['message']}", 
-                                title="Assistant", 
-                                border_style="green"
+                                f"{data['message']} (retry in {data['retry_after']}s)",
+                                title="Server Busy",
+                                border_style="yellow"
                             ))
                         elif data["type"] == 'error':
                             console.print()
@@ -85,4 +133,10 @@ async def chat():
 
 
 
-asyncio.run(chat())
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Command-line client for the /ws/chat WebSocket API")
+    parser.add_argument("--no-stream", action="store_true",
+        help="Wait for the whole response instead of rendering text as it streams in")
+    args = parser.parse_args()
+
+    asyncio.run(chat(stream=not args.no_stream))